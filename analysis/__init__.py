@@ -0,0 +1,33 @@
+from .confidence import ConfidenceInterval, confidence_interval
+from .run import RunResult, run_simulation
+from .replications import ReplicationResult, compare_configs, run_replications
+from .convergence import calculate_trustworthy_probability, calculate_next_target_amount_of_requests, decide_rejection_probability
+from .device_search import DeviceSearchResult, find_min_devices
+from .cache import ResultCache
+from .progress import ProgressMonitor, RunCancelled
+from .sweep import SweepPoint, SweepResult, sweep, sweep_table
+from .rare_event import RareEventResult, estimate_rejection_probability
+
+__all__ = [
+    'ConfidenceInterval',
+    'confidence_interval',
+    'RunResult',
+    'run_simulation',
+    'ReplicationResult',
+    'run_replications',
+    'compare_configs',
+    'calculate_trustworthy_probability',
+    'calculate_next_target_amount_of_requests',
+    'decide_rejection_probability',
+    'DeviceSearchResult',
+    'find_min_devices',
+    'SweepPoint',
+    'SweepResult',
+    'sweep',
+    'sweep_table',
+    'RareEventResult',
+    'estimate_rejection_probability',
+    'ResultCache',
+    'ProgressMonitor',
+    'RunCancelled'
+]
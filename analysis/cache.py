@@ -0,0 +1,200 @@
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import tempfile
+from typing import Iterator, List, Optional, Tuple
+import zlib
+
+from analysis.run import RunResult, run_simulation
+from my_simulator import SimulatorConfig, SimulatorLaw
+from simulator import ENGINE_VERSION, DeviceStatistics, SourceStatistics
+from simulator.statistics import ElementStatistics
+from simulator.variates import backend_name
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "smo-py")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ENTRY_SUFFIX = ".result"
+LOCK_NAME = ".lock"
+
+
+# On-disk cache of finished runs keyed by a hash of (config, law, seed, engine version).
+# Entries are written atomically; the least recently used ones are evicted past max_bytes.
+class ResultCache:
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def run(self, config: SimulatorConfig, law: SimulatorLaw, seed: Optional[int] = None) -> RunResult:
+        result = self.get(config, law, seed)
+        if (result is None):
+            result = run_simulation(config, law, seed)
+            self.put(config, law, seed, result)
+        return result
+
+    def get(self, config: SimulatorConfig, law: SimulatorLaw, seed: Optional[int] = None) -> Optional[RunResult]:
+        key = cache_key(config, law, seed)
+        if (key is None):
+            return None
+
+        path = self.__entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        try:
+            return decode_result(data)
+        except (zlib.error, ValueError, KeyError, TypeError):
+            self.__remove(path)
+            return None
+
+    def put(self, config: SimulatorConfig, law: SimulatorLaw, seed: Optional[int], result: RunResult) -> None:
+        key = cache_key(config, law, seed)
+        if (key is None):
+            return
+
+        (fd, temp_path) = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(encode_result(result))
+            os.replace(temp_path, self.__entry_path(key))
+        except BaseException:
+            self.__remove(temp_path)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        with self.__lock():
+            entries = self.__entries()
+            total = sum(size for (_, size, _) in entries)
+            for (path, size, _) in sorted(entries, key=lambda entry: entry[2]):
+                if (total <= self.max_bytes):
+                    break
+                self.__remove(path)
+                total -= size
+
+    def clear(self) -> None:
+        with self.__lock():
+            for (path, _, _) in self.__entries():
+                self.__remove(path)
+
+    def __entries(self) -> List[Tuple[str, int, float]]:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if (not entry.name.endswith(ENTRY_SUFFIX)):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def __entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    @contextmanager
+    def __lock(self) -> Iterator[None]:
+        if (fcntl is None):
+            yield
+            return
+        with open(os.path.join(self.directory, LOCK_NAME), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def __remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def cache_key(config: SimulatorConfig, law: SimulatorLaw, seed: Optional[int] = None) -> Optional[str]:
+    # Unseeded runs are not reproducible, so they have no key
+    seed = seed if seed is not None else config.seed
+    if (seed is None):
+        return None
+
+    description = {
+        "engine": ENGINE_VERSION,
+        # Seeded streams differ between NumPy and random.Random
+        "backend": backend_name(),
+        "law": law.name,
+        "seed": seed,
+        "buffer_capacity": config.buffer_capacity,
+        "target_amount_of_requests": config.target_amount_of_requests,
+        "source_periods": list(config.source_periods),
+        "device_coefficients": list(config.device_coefficients)
+    }
+    # Only set when used, so keys of plain runs stay as they were
+    if (config.common_random_numbers):
+        description["common_random_numbers"] = True
+    if (config.antithetic):
+        description["antithetic"] = True
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+def encode_result(result: RunResult) -> bytes:
+    data = {
+        "sources": [
+            [
+                source.generated, 
+                source.rejected, 
+                source.next_request_time, 
+                source.buffer_stats.count, 
+                source.buffer_stats.mean, 
+                source.buffer_stats.m2, 
+                source.buffer_stats.total, 
+                source.device_stats.count, 
+                source.device_stats.mean, 
+                source.device_stats.m2, 
+                source.device_stats.total
+            ]
+            for source in result.source_statistics
+        ],
+        "devices": [[device.time_in_usage, device.next_request_time] for device in result.device_statistics],
+        "simulation_time": result.simulation_time,
+        "amount_of_requests": result.amount_of_requests,
+        "rejected_amount": result.rejected_amount,
+        "seed": result.seed
+    }
+    return zlib.compress(json.dumps(data, separators=(',', ':')).encode())
+
+def decode_result(data: bytes) -> RunResult:
+    decoded = json.loads(zlib.decompress(data))
+    return RunResult(
+        source_statistics=[
+            SourceStatistics(
+                generated=generated, 
+                rejected=rejected, 
+                next_request_time=next_request_time, 
+                buffer_stats=ElementStatistics(buffer_count, buffer_mean, buffer_m2, buffer_total), 
+                device_stats=ElementStatistics(device_count, device_mean, device_m2, device_total)
+            )
+            for (
+                generated, rejected, next_request_time, 
+                buffer_count, buffer_mean, buffer_m2, buffer_total, 
+                device_count, device_mean, device_m2, device_total
+            ) in decoded["sources"]
+        ],
+        device_statistics=[
+            DeviceStatistics(time_in_usage=usage, next_request_time=next_request_time) 
+            for (usage, next_request_time) in decoded["devices"]
+        ],
+        simulation_time=decoded["simulation_time"],
+        amount_of_requests=decoded["amount_of_requests"],
+        rejected_amount=decoded["rejected_amount"],
+        seed=decoded["seed"]
+    )
@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+import math
+from statistics import NormalDist, fmean, stdev
+from typing import Sequence
+
+DEFAULT_CONFIDENCE = 0.95
+
+
+@dataclass(frozen=True)
+class ConfidenceInterval:
+    mean: float
+    half_width: float
+    confidence: float
+
+    @property
+    def low(self) -> float:
+        return self.mean - self.half_width
+
+    @property
+    def high(self) -> float:
+        return self.mean + self.half_width
+
+    def relative_half_width(self) -> float:
+        if (self.mean == 0):
+            return math.inf if self.half_width > 0 else 0.0
+        return self.half_width / abs(self.mean)
+
+def confidence_interval(values: Sequence[float], confidence: float = DEFAULT_CONFIDENCE) -> ConfidenceInterval:
+    if (len(values) == 0):
+        raise ValueError("At least one value is required")
+
+    mean = fmean(values)
+    if (len(values) == 1):
+        return ConfidenceInterval(mean, math.inf, confidence)
+
+    t = student_t_quantile(0.5 + confidence / 2, len(values) - 1)
+    return ConfidenceInterval(mean, t * stdev(values, mean) / math.sqrt(len(values)), confidence)
+
+def student_t_quantile(p: float, degrees_of_freedom: int) -> float:
+    # Exact for 1 and 2 degrees of freedom, Cornish-Fisher expansion of the normal quantile otherwise
+    df = degrees_of_freedom
+    if (df == 1):
+        return math.tan(math.pi * (p - 0.5))
+    if (df == 2):
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+
+    z = NormalDist().inv_cdf(p)
+    g1 = (z ** 3 + z) / 4
+    g2 = (5 * z ** 5 + 16 * z ** 3 + 3 * z) / 96
+    g3 = (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / 384
+    g4 = (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / 92160
+    return z + g1 / df + g2 / df ** 2 + g3 / df ** 3 + g4 / df ** 4
@@ -0,0 +1,56 @@
+from typing import Optional, Tuple
+
+from analysis.progress import ProgressMonitor, run_to_completion
+from my_simulator import MySimulator
+from simulator.sequential import DEFAULT_BATCHES, DEFAULT_MIN_OBSERVATIONS, SequentialRejectionTest
+
+
+def calculate_trustworthy_probability(sim: MySimulator, max_requests: int, monitor: Optional[ProgressMonitor] = None) -> float:
+    next_requests = 0
+    prev_rejection = 0.0
+    current_rejection = -1.0
+    while (True):
+        prev_rejection = current_rejection
+        run_to_completion(sim, monitor)
+        current_requests = sim.target_amount_of_requests
+        current_rejection = sim.observed_rejected_amount / sim.observed_amount_of_requests
+        if (current_requests == max_requests or abs((current_rejection - prev_rejection) / prev_rejection) < 0.1):
+            return current_rejection
+        
+        if (current_rejection == 0):
+            next_requests = max_requests
+        else:
+            next_requests = int(calculate_next_target_amount_of_requests(current_rejection))
+        if (next_requests >= max_requests):
+            next_requests = max_requests
+        if (next_requests <= sim.current_amount_of_requests):
+            return current_rejection
+
+        sim.extend(next_requests)
+
+# Runs until the sequential test settles whether the rejection probability is above the target,
+# or until max_requests are generated. Returns the estimate and whether the target is met.
+# The test waits for DEFAULT_MIN_OBSERVATIONS requests, but at most half of max_requests,
+# so a small limit still leaves room for an early decision.
+def decide_rejection_probability(
+    sim: MySimulator, 
+    target_probability: float, 
+    max_requests: int, 
+    monitor: Optional[ProgressMonitor] = None
+) -> Tuple[float, bool]:
+    min_observations = max(2 * DEFAULT_BATCHES, min(DEFAULT_MIN_OBSERVATIONS, max_requests // 2))
+    rule = SequentialRejectionTest(target_probability, min_observations=min_observations)
+    sim.set_stopping_rule(rule)
+    if (max_requests > sim.current_amount_of_requests):
+        sim.extend(max_requests)
+    run_to_completion(sim, monitor)
+    probability = sim.observed_rejected_amount / sim.observed_amount_of_requests
+    if (rule.decided):
+        return (probability, not rule.exceeds_target)
+    return (probability, probability <= target_probability)
+
+def calculate_next_target_amount_of_requests(rejection_probability: float) -> float:
+    t_a = 1.643
+    delta = 0.1
+    p = rejection_probability
+    return (t_a * t_a * (1 - p)) / (p * delta * delta)
@@ -0,0 +1,179 @@
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from dataclasses import dataclass, replace
+from functools import partial
+import multiprocessing
+import os
+from random import Random
+from typing import Callable, Dict, List, Optional, Tuple
+
+from analysis.convergence import calculate_trustworthy_probability, decide_rejection_probability
+from analysis.progress import ProgressMonitor, RunCancelled
+from analysis.run import RunResult, collect_result
+from my_simulator import MySimulator, SimulatorConfig, SimulatorLaw
+from simulator.warmup import Mser5Detector
+
+DEFAULT_MAX_DEVICES_ADDED = 1024
+
+Outcome = Tuple[float, bool, MySimulator]
+
+# Monitor of a worker process, sharing the cancellation of the monitor in the parent
+_process_monitor: Optional[ProgressMonitor] = None
+
+
+@dataclass
+class DeviceSearchResult:
+    devices_added: int
+    config: SimulatorConfig
+    rejection_probability: float
+    result: RunResult
+    simulator: MySimulator
+
+    @property
+    def devices_amount(self) -> int:
+        return len(self.config.device_coefficients)
+
+def with_added_devices(config: SimulatorConfig, devices_added: int, avg_processing_time: int) -> SimulatorConfig:
+    return replace(
+        config, 
+        device_coefficients=tuple(config.device_coefficients) + (avg_processing_time,) * devices_added
+    )
+
+# Returns the rejection probability estimate, whether it meets the target and the simulator
+def evaluate_candidate(
+    config: SimulatorConfig, 
+    law: SimulatorLaw, 
+    target_rejection_probability: float, 
+    avg_processing_time: int, 
+    max_requests: int, 
+    warmup: bool, 
+    sequential: bool, 
+    devices_added: int, 
+    monitor: Optional[ProgressMonitor] = None
+) -> Tuple[float, bool, MySimulator]:
+    sim = MySimulator(with_added_devices(config, devices_added, avg_processing_time), law)
+    if (warmup):
+        sim.set_warmup_detector(Mser5Detector())
+    if (sequential):
+        (probability, fits) = decide_rejection_probability(sim, target_rejection_probability, max_requests, monitor)
+        return (probability, fits, sim)
+    probability = calculate_trustworthy_probability(sim, max_requests, monitor)
+    return (probability, probability <= target_rejection_probability, sim)
+
+def find_min_devices(
+    config: SimulatorConfig, 
+    law: SimulatorLaw, 
+    target_rejection_probability: float, 
+    avg_processing_time: int, 
+    max_requests: int, 
+    max_devices_added: int = DEFAULT_MAX_DEVICES_ADDED, 
+    max_workers: Optional[int] = None, 
+    warmup: bool = False, 
+    sequential: bool = False, 
+    monitor: Optional[ProgressMonitor] = None
+) -> DeviceSearchResult:
+    # Every candidate runs with config.seed. With common random numbers neighbouring device
+    # counts then get the same work per request, so an unseeded config gets one seed for all.
+    if (config.common_random_numbers and config.seed is None):
+        config = replace(config, seed=Random().getrandbits(63))
+    # A sequential test stops each candidate as soon as it is clearly above or below the target.
+    # It needs a target strictly between 0 and 1, otherwise candidates run as before.
+    sequential = sequential and 0 < target_rejection_probability < 1
+    workers = max_workers or os.cpu_count() or 1
+    evaluate = partial(
+        evaluate_candidate, config, law, target_rejection_probability, avg_processing_time, max_requests, warmup, sequential
+    )
+    if (workers == 1):
+        return _search(lambda candidates: [evaluate(k, monitor=monitor) for k in candidates], max_devices_added, 1)
+    if (monitor is None):
+        with ProcessPoolExecutor(workers) as executor:
+            return _search(lambda candidates: list(executor.map(evaluate, candidates)), max_devices_added, workers)
+
+    # Worker processes check a shared event between batches of events, the monitor here reports
+    # every finished candidate and sets the event once it is cancelled
+    cancel_event = multiprocessing.Event()
+    with ProcessPoolExecutor(workers, initializer=_init_worker_monitor, initargs=(cancel_event,)) as executor:
+        run = partial(_evaluate_monitored, executor, partial(_evaluate_in_worker, evaluate), monitor, cancel_event)
+        return _search(run, max_devices_added, workers)
+
+def _init_worker_monitor(cancel_event) -> None:
+    global _process_monitor
+    _process_monitor = ProgressMonitor(cancel_event=cancel_event)
+
+def _evaluate_in_worker(evaluate: Callable[..., Outcome], devices_added: int) -> Outcome:
+    return evaluate(devices_added, monitor=_process_monitor)
+
+def _evaluate_monitored(
+    executor: Executor, 
+    evaluate: Callable[[int], Outcome], 
+    monitor: ProgressMonitor, 
+    cancel_event, 
+    candidates: List[int]
+) -> List[Outcome]:
+    futures = {executor.submit(evaluate, k): i for i, k in enumerate(candidates)}
+    outcomes: List[Optional[Outcome]] = [None] * len(candidates)
+    pending = set(futures)
+    while (pending):
+        if (monitor.cancelled):
+            cancel_event.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise RunCancelled()
+        (done, pending) = wait(pending, timeout=monitor.report_interval, return_when=FIRST_COMPLETED)
+        for future in done:
+            outcome = future.result()
+            outcomes[futures[future]] = outcome
+            monitor.add_finished(outcome[2])
+    return outcomes
+
+def _search(
+    evaluate_all_candidates: Callable[[List[int]], List[Outcome]], 
+    max_devices_added: int, 
+    workers: int
+) -> DeviceSearchResult:
+    evaluated: Dict[int, Outcome] = {}
+
+    def evaluate_all(candidates: List[int]) -> None:
+        candidates = [k for k in candidates if k not in evaluated]
+        evaluated.update(zip(candidates, evaluate_all_candidates(candidates)))
+
+    def fits(k: int) -> bool:
+        return evaluated[k][1]
+
+    # Bracketing: 0, 1, 2, 4, 8, ... devices added, `workers` candidates at a time
+    exponential = [0] + [2 ** i for i in range(max_devices_added.bit_length())]
+    if (exponential[-1] != max_devices_added):
+        exponential.append(max_devices_added)
+    low = -1
+    high: Optional[int] = None
+    for start in range(0, len(exponential), workers):
+        batch = exponential[start:start + workers]
+        evaluate_all(batch)
+        fitting = [k for k in batch if fits(k)]
+        if (fitting):
+            high = fitting[0]
+            low = max([low] + [k for k in batch if k < high])
+            break
+        low = batch[-1]
+
+    if (high is None):
+        raise RuntimeError(f"Target rejection probability is not reached with {max_devices_added} added devices")
+
+    # Multi-way bisection: `workers` inner points of (low, high) per round
+    while (high - low > 1):
+        step = (high - low) / (workers + 1)
+        inner = sorted({low + max(1, round(step * i)) for i in range(1, workers + 1)} - {high})
+        inner = [k for k in inner if low < k < high]
+        evaluate_all(inner)
+        for k in inner:
+            if (fits(k)):
+                high = k
+                break
+            low = k
+
+    (probability, _, sim) = evaluated[high]
+    return DeviceSearchResult(
+        devices_added=high,
+        config=sim.config,
+        rejection_probability=probability,
+        result=collect_result(sim),
+        simulator=sim
+    )
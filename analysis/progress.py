@@ -0,0 +1,85 @@
+from threading import Event
+import time
+from typing import Callable, Final, Optional
+
+from simulator import RunSummary, Simulator
+
+DEFAULT_BATCH_EVENTS: Final[int] = 1000
+DEFAULT_REPORT_INTERVAL: Final[float] = 0.1
+
+
+class RunCancelled(Exception):
+    pass
+
+# Runs simulators in batches of events, reporting progress at most every report_interval seconds
+# and checking for cancellation between batches. The simulator is left in a consistent state
+# after a cancelled batch. cancel() may be called from any thread; a multiprocessing.Event
+# passed as cancel_event lets monitors in worker processes share one cancellation.
+class ProgressMonitor:
+
+    def __init__(
+        self,
+        report: Optional[Callable[[int, float], None]] = None,
+        batch_events: int = DEFAULT_BATCH_EVENTS,
+        report_interval: float = DEFAULT_REPORT_INTERVAL,
+        cancel_event: Optional[Event] = None
+    ):
+        if (batch_events < 1):
+            raise ValueError("Batch must hold at least one event")
+        self._report: Optional[Callable[[int, float], None]] = report
+        self._batch_events: int = batch_events
+        self._report_interval: float = report_interval
+        self._cancelled: Event = cancel_event if cancel_event is not None else Event()
+        self._events: int = 0
+        self._last_report: float = 0.0
+
+    # Events done by all simulators run so far
+    @property
+    def events(self) -> int:
+        return self._events
+
+    @property
+    def report_interval(self) -> float:
+        return self._report_interval
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    # run defaults to sim.run_for, a wrapper such as Replay.run_for may be passed instead
+    def run_to_completion(self, sim: Simulator, run: Optional[Callable[[int], RunSummary]] = None) -> None:
+        run = run or sim.run_for
+        while (not sim.is_completed()):
+            if (self._cancelled.is_set()):
+                raise RunCancelled()
+            self._events += run(self._batch_events).events
+            self.__maybe_report(sim)
+        self.__report(sim)
+
+    # Accounts for a simulator completed elsewhere, e.g. in a worker process, and reports it
+    def add_finished(self, sim: Simulator) -> None:
+        # Every request was generated once and every accepted one was released once
+        self._events += 2 * sim.current_amount_of_requests - sim.rejected_amount
+        self.__report(sim)
+
+    def __maybe_report(self, sim: Simulator) -> None:
+        if (time.monotonic() - self._last_report >= self._report_interval):
+            self.__report(sim)
+
+    def __report(self, sim: Simulator) -> None:
+        self._last_report = time.monotonic()
+        if (self._report is not None):
+            self._report(self._events, rejection_estimate(sim))
+
+def rejection_estimate(sim: Simulator) -> float:
+    requests = sim.observed_amount_of_requests
+    return sim.observed_rejected_amount / requests if requests > 0 else 0.0
+
+def run_to_completion(sim: Simulator, monitor: Optional[ProgressMonitor] = None) -> None:
+    if (monitor is None):
+        sim.run_to_completion()
+    else:
+        monitor.run_to_completion(sim)
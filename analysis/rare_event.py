@@ -0,0 +1,205 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from functools import partial
+from math import log
+from random import Random
+from typing import List, Optional, Sequence, Tuple, Union
+
+from analysis.confidence import DEFAULT_CONFIDENCE, ConfidenceInterval, confidence_interval
+from my_simulator import MySimulator, SimulatorConfig, SimulatorLaw
+
+DEFAULT_REPLICATIONS = 10
+# The pilot costs little next to the splitting, and a longer one extrapolates less
+DEFAULT_PILOT_FRACTION = 1.0
+MIN_PILOT_CROSSINGS = 20
+# Up-crossings of consecutive default thresholds differ about this many times
+DEFAULT_SPLIT_RATIO = 6
+# Share of that drop used as the amount of splits
+DEFAULT_SPLIT_SHARE = 2 / 3
+
+
+@dataclass
+class RareEventResult:
+    rejection_probability: ConfidenceInterval
+    estimates: List[float]
+    thresholds: Tuple[int, ...]
+    splits: Tuple[int, ...]
+    simulated_events: int
+    trajectories: int
+
+def estimate_rejection_probability(
+    config: SimulatorConfig,
+    law: SimulatorLaw,
+    thresholds: Optional[Sequence[int]] = None,
+    splits: Union[None, int, Sequence[int]] = None,
+    replications: int = DEFAULT_REPLICATIONS,
+    base_seed: int = 0,
+    confidence: float = DEFAULT_CONFIDENCE,
+    max_workers: Optional[int] = None
+) -> RareEventResult:
+    if (law != SimulatorLaw.STOCHASTIC):
+        raise ValueError("Splitting needs random processing times, use the stochastic law")
+    if (replications < 2):
+        raise ValueError("At least two replications are needed for a confidence interval")
+
+    crossings = None
+    if (thresholds is None or splits is None):
+        pilot_requests = max(1, int(config.target_amount_of_requests * DEFAULT_PILOT_FRACTION))
+        crossings = pilot_crossings(config, pilot_requests, base_seed)
+    thresholds = spaced_thresholds(crossings) if thresholds is None else tuple(thresholds)
+    if (list(thresholds) != sorted(set(thresholds)) or (thresholds and not 0 < thresholds[0] <= thresholds[-1] <= config.buffer_capacity)):
+        raise ValueError("Thresholds must be increasing buffer levels between 1 and the buffer capacity")
+    if (splits is None):
+        splits = pilot_splits(crossings, thresholds)
+    splits = (splits,) * len(thresholds) if isinstance(splits, int) else tuple(splits)
+    if (len(splits) != len(thresholds) or min(splits, default=1) < 1):
+        raise ValueError("Every threshold needs a positive amount of splits")
+
+    # Each replication is a whole RESTART run seeded with base_seed + i, so replications
+    # are independent and the interval is taken over their estimates
+    seeds = [base_seed + i for i in range(replications)]
+    run = partial(_restart_replication, config, thresholds, splits)
+    if (max_workers == 1):
+        outcomes = list(map(run, seeds))
+    else:
+        with ProcessPoolExecutor(max_workers) as executor:
+            outcomes = list(executor.map(run, seeds))
+
+    estimates = [estimate for (estimate, _, _) in outcomes]
+    return RareEventResult(
+        rejection_probability=confidence_interval(estimates, confidence),
+        estimates=estimates,
+        thresholds=thresholds,
+        splits=splits,
+        simulated_events=sum(events for (_, events, _) in outcomes),
+        trajectories=sum(trajectories for (_, _, trajectories) in outcomes)
+    )
+
+# Up-crossings of every buffer level in a plain run, index 0 is unused. Levels the pilot
+# did not reach often enough are extrapolated with the average decay per level of the reached ones.
+def pilot_crossings(config: SimulatorConfig, pilot_requests: int, seed: int) -> List[float]:
+    sim = MySimulator(replace(config, target_amount_of_requests=pilot_requests), SimulatorLaw.STOCHASTIC, seed)
+    crossings = [0] * (config.buffer_capacity + 1)
+    level = 0
+    while (not sim.is_completed()):
+        sim.run_while(lambda s: s.buffer_level == level)
+        new_level = sim.buffer_level
+        if (new_level > level):
+            crossings[new_level] += 1
+        level = new_level
+
+    reliable = [level for level in range(1, len(crossings)) if crossings[level] >= MIN_PILOT_CROSSINGS]
+    if (not reliable):
+        return [float(amount) for amount in crossings]
+    last = reliable[-1]
+    decay = (crossings[last] / crossings[1]) ** (1 / (last - 1)) if last > 1 else 1.0
+    return [
+        float(crossings[level]) if level <= last else crossings[last] * decay ** (level - last)
+        for level in range(len(crossings))
+    ]
+
+# Thresholds split the drop of up-crossings from level 1 to a full buffer into steps of about
+# ratio times, even on a log scale, so the last one is at the capacity and rejections are seen
+# by the most trajectories. Few thresholds with large splits keep the saved states few.
+def spaced_thresholds(crossings: Sequence[float], ratio: float = DEFAULT_SPLIT_RATIO) -> Tuple[int, ...]:
+    capacity = len(crossings) - 1
+    if (capacity < 2 or crossings[1] <= 0 or crossings[capacity] <= 0):
+        return ()
+    drop = log(crossings[1] / crossings[capacity])
+    steps = round(drop / log(ratio))
+    reached = [level for level in range(2, capacity + 1) if crossings[level] > 0]
+    thresholds: List[int] = []
+    for step in range(1, steps + 1):
+        goal = log(crossings[1]) - drop * step / steps
+        level = min(reached, key=lambda level: abs(log(crossings[level]) - goal))
+        if (not thresholds or level > thresholds[-1]):
+            thresholds.append(level)
+    return tuple(thresholds)
+
+# Splitting by the whole drop of crossings between consecutive thresholds would keep the amount
+# of trajectories the same in every region. Crossings come in bursts, though, so retrials born
+# together are alike, and splitting by a share of the drop gives more for the work spent.
+def pilot_splits(
+    crossings: Sequence[float],
+    thresholds: Sequence[int],
+    share: float = DEFAULT_SPLIT_SHARE
+) -> Tuple[int, ...]:
+    splits = []
+    for (lower, upper) in zip((1,) + tuple(thresholds), thresholds):
+        splits.append(max(1, int(share * crossings[lower] / crossings[upper])) if crossings[upper] > 0 else 1)
+    return tuple(splits)
+
+def _restart_replication(
+    config: SimulatorConfig,
+    thresholds: Tuple[int, ...],
+    splits: Tuple[int, ...],
+    seed: int
+) -> Tuple[float, int, int]:
+    sim = MySimulator(config, SimulatorLaw.STOCHASTIC, seed)
+    return restart(sim, thresholds, splits, Random(seed))
+
+def restart(
+    sim: MySimulator,
+    thresholds: Sequence[int],
+    splits: Sequence[int],
+    rng: Random
+) -> Tuple[float, int, int]:
+    # RESTART splitting on buffer occupancy. Region j holds the levels between thresholds j and
+    # j + 1. When a trajectory enters region j from below, the state is saved and splits[j - 1] - 1
+    # retrials are run from it, each dropped once it falls below threshold j.
+    # Then the trajectory itself goes on from the same state. A rejection seen in region j counts
+    # 1 / (splits[0] * ... * splits[j - 1]), so the weighted count is an unbiased estimate of the
+    # rejections of a plain run. The simulator is used for all of them, its statistics are lost.
+    # Streams drawn per device are not part of a saved state and go on after a restore, so every
+    # retrial draws new work. Common random numbers tie the work to request numbers, which repeat
+    # after a restore, so there a retrial needs a fresh seed.
+    reseed = sim.config.common_random_numbers
+    weights = [1.0]
+    for split in splits:
+        weights.append(weights[-1] / split)
+    capacity = sim.buffer_capacity
+    regions = [0] * (capacity + 1)
+    for threshold in thresholds:
+        for level in range(threshold, capacity + 1):
+            regions[level] += 1
+    lows = (0,) + tuple(thresholds)
+    highs = tuple(thresholds) + (capacity + 1,)
+
+    weighted_rejections = 0.0
+    events = 0
+    trajectories = 1
+    # [state, region, retrials still to start, birth region of the trajectory that entered it].
+    # The running trajectory is the first retrial, the entering one goes on after the last.
+    entered: List[list] = []
+    birth_region = 0
+    region = regions[sim.buffer_level]
+    while (True):
+        (low, high) = (lows[region], highs[region])
+        summary = sim.run_while(lambda s: low <= s.buffer_level < high)
+        events += summary.events
+        # Rejections keep the buffer full, so all of them happened in this region
+        weighted_rejections += summary.rejected * weights[region]
+        new_region = regions[sim.buffer_level]
+        if (sim.is_completed() or new_region < birth_region):
+            if (not entered):
+                break
+            top = entered[-1]
+            sim._restore_state(top[0])
+            if (reseed):
+                sim.reseed(rng.getrandbits(63))
+            region = top[1]
+            if (top[2] > 0):
+                top[2] -= 1
+                birth_region = region
+                trajectories += 1
+            else:
+                entered.pop()
+                birth_region = top[3]
+            continue
+        if (new_region > region and splits[new_region - 1] > 1):
+            entered.append([sim._save_state(), new_region, splits[new_region - 1] - 2, birth_region])
+            birth_region = new_region
+            trajectories += 1
+        region = new_region
+
+    return (weighted_rejections / sim.target_amount_of_requests, events, trajectories)
@@ -0,0 +1,115 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import List, Optional
+
+from analysis.cache import ResultCache
+from analysis.confidence import DEFAULT_CONFIDENCE, ConfidenceInterval, confidence_interval
+from analysis.run import RunResult, run_simulation
+from my_simulator import SimulatorConfig, SimulatorLaw
+from simulator import DeviceStatistics, SourceStatistics
+
+
+@dataclass
+class ReplicationResult:
+    replications: List[RunResult]
+    source_statistics: List[SourceStatistics]
+    device_statistics: List[DeviceStatistics]
+    simulation_time: int
+    rejection_probability: ConfidenceInterval
+    avg_buffer_time: ConfidenceInterval
+    utilization: ConfidenceInterval
+    device_utilization: List[ConfidenceInterval]
+
+def run_replications(
+    config: SimulatorConfig, 
+    law: SimulatorLaw, 
+    replications: int, 
+    base_seed: int, 
+    confidence: float = DEFAULT_CONFIDENCE, 
+    max_workers: Optional[int] = None,
+    cache: Optional[ResultCache] = None,
+    antithetic: bool = False
+) -> ReplicationResult:
+    if (replications < 1):
+        raise ValueError("At least one replication is required")
+
+    # Replication i is seeded with base_seed + i, so the outcome does not depend on scheduling.
+    # Antithetic replications come in pairs sharing a seed, the second one mirroring the first.
+    if (antithetic):
+        if (replications % 2 != 0):
+            raise ValueError("Antithetic replications come in pairs")
+        seeds = [base_seed + i // 2 for i in range(replications)]
+        configs = [
+            replace(config, common_random_numbers=True, antithetic=(i % 2 == 1)) 
+            for i in range(replications)
+        ]
+    else:
+        seeds = [base_seed + i for i in range(replications)]
+        configs = [config] * replications
+    run = partial(_run_replication, law, cache)
+    if (max_workers == 1):
+        results = list(map(run, configs, seeds))
+    else:
+        with ProcessPoolExecutor(max_workers) as executor:
+            results = list(executor.map(run, configs, seeds))
+
+    return aggregate_replications(results, confidence, antithetic)
+
+def compare_configs(
+    config_a: SimulatorConfig, 
+    config_b: SimulatorConfig, 
+    law: SimulatorLaw, 
+    replications: int, 
+    base_seed: int, 
+    confidence: float = DEFAULT_CONFIDENCE, 
+    max_workers: Optional[int] = None, 
+    cache: Optional[ResultCache] = None
+) -> ConfidenceInterval:
+    # Replication i of both configurations uses the same seed, so with common random numbers
+    # the rejection probabilities are paired and their difference has a much smaller variance
+    results_a = run_replications(config_a, law, replications, base_seed, confidence, max_workers, cache)
+    results_b = run_replications(config_b, law, replications, base_seed, confidence, max_workers, cache)
+    return confidence_interval(
+        [
+            a.rejection_probability() - b.rejection_probability() 
+            for a, b in zip(results_a.replications, results_b.replications)
+        ], 
+        confidence
+    )
+
+def _run_replication(law: SimulatorLaw, cache: Optional[ResultCache], config: SimulatorConfig, seed: int) -> RunResult:
+    if (cache is None):
+        return run_simulation(config, law, seed)
+    return cache.run(config, law, seed)
+
+def aggregate_replications(
+    results: List[RunResult], 
+    confidence: float = DEFAULT_CONFIDENCE, 
+    antithetic: bool = False
+) -> ReplicationResult:
+    sources = [SourceStatistics() for _ in results[0].source_statistics]
+    devices = [DeviceStatistics() for _ in results[0].device_statistics]
+    for result in results:
+        for total, source in zip(sources, result.source_statistics):
+            total.merge(source)
+        for total, device in zip(devices, result.device_statistics):
+            total.merge(device)
+
+    def interval(values: List[float]) -> ConfidenceInterval:
+        # Members of an antithetic pair are dependent, so only pair means are independent
+        if (antithetic):
+            values = [(values[i] + values[i + 1]) / 2 for i in range(0, len(values), 2)]
+        return confidence_interval(values, confidence)
+
+    device_usage = [result.device_utilization() for result in results]
+    return ReplicationResult(
+        replications=results,
+        source_statistics=sources,
+        device_statistics=devices,
+        simulation_time=sum(result.simulation_time for result in results),
+        rejection_probability=interval([result.rejection_probability() for result in results]),
+        avg_buffer_time=interval([result.avg_buffer_time() for result in results]),
+        utilization=interval([result.utilization() for result in results]),
+        device_utilization=[interval([usage[i] for usage in device_usage]) for i in range(len(devices))]
+    )
@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+from my_simulator import MySimulator, SimulatorConfig, SimulatorLaw
+from simulator import DeviceStatistics, SourceStatistics
+
+
+@dataclass
+class RunResult:
+    source_statistics: List[SourceStatistics]
+    device_statistics: List[DeviceStatistics]
+    simulation_time: int
+    amount_of_requests: int
+    rejected_amount: int
+    seed: Optional[int] = None
+
+    def rejection_probability(self) -> float:
+        return self.rejected_amount / self.amount_of_requests
+
+    def avg_buffer_time(self) -> float:
+        return sum(source.buffer_stats.time for source in self.source_statistics) / self.amount_of_requests
+
+    def device_utilization(self) -> List[float]:
+        return [device.time_in_usage / self.simulation_time for device in self.device_statistics]
+
+    def utilization(self) -> float:
+        usage = self.device_utilization()
+        return sum(usage) / len(usage)
+
+def collect_result(sim: MySimulator) -> RunResult:
+    return RunResult(
+        source_statistics=sim.snapshot_source_statistics(),
+        device_statistics=sim.snapshot_device_statistics(),
+        simulation_time=sim.observed_simulation_time,
+        amount_of_requests=sim.observed_amount_of_requests,
+        rejected_amount=sim.observed_rejected_amount,
+        seed=sim.seed
+    )
+
+def run_simulation(config: SimulatorConfig, law: SimulatorLaw, seed: Optional[int] = None) -> RunResult:
+    sim = MySimulator(config, law, seed)
+    sim.run_to_completion()
+    return collect_result(sim)
@@ -0,0 +1,150 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, replace
+import os
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from analysis.cache import ResultCache
+from analysis.run import RunResult, run_simulation
+from my_simulator import SimulatorConfig, SimulatorLaw
+
+DEFAULT_NEGLIGIBLE_REJECTION = 1e-4
+
+
+@dataclass(frozen=True)
+class SweepPoint:
+    buffer_capacity: int
+    device_coefficients: Tuple[int, ...]
+    period_scale: float
+
+    def group(self) -> Tuple[Tuple[int, ...], float]:
+        return (self.device_coefficients, self.period_scale)
+
+@dataclass
+class SweepResult:
+    point: SweepPoint
+    config: SimulatorConfig
+    result: RunResult
+
+def expand_grid(
+    base_config: SimulatorConfig,
+    buffer_capacities: Sequence[int],
+    device_sets: Optional[Sequence[Sequence[int]]] = None,
+    period_scales: Sequence[float] = (1.0,)
+) -> List[SweepPoint]:
+    # Capacity-major order, so the small buffers of every group are scheduled first
+    if (device_sets is None):
+        device_sets = [base_config.device_coefficients]
+    return [
+        SweepPoint(capacity, tuple(devices), scale)
+        for capacity in sorted(buffer_capacities)
+        for devices in device_sets
+        for scale in period_scales
+    ]
+
+def point_config(base_config: SimulatorConfig, point: SweepPoint) -> SimulatorConfig:
+    return replace(
+        base_config,
+        buffer_capacity=point.buffer_capacity,
+        device_coefficients=point.device_coefficients,
+        source_periods=tuple(max(1, round(period * point.period_scale)) for period in base_config.source_periods)
+    )
+
+def sweep(
+    base_config: SimulatorConfig,
+    law: SimulatorLaw,
+    buffer_capacities: Sequence[int],
+    device_sets: Optional[Sequence[Sequence[int]]] = None,
+    period_scales: Sequence[float] = (1.0,),
+    seed: Optional[int] = None,
+    negligible_rejection: float = DEFAULT_NEGLIGIBLE_REJECTION,
+    max_workers: Optional[int] = None,
+    cache: Optional[ResultCache] = None
+) -> Iterator[SweepResult]:
+    # Yields results as points finish. Once a (devices, period scale) group shows a negligible
+    # rejection probability, its larger buffer capacities are not simulated.
+    points = expand_grid(base_config, buffer_capacities, device_sets, period_scales)
+    run = run_simulation if cache is None else cache.run
+    resolved: Dict[Tuple[Tuple[int, ...], float], int] = {}
+
+    def is_skipped(point: SweepPoint) -> bool:
+        group = point.group()
+        return group in resolved and resolved[group] < point.buffer_capacity
+
+    def finish(point: SweepPoint, config: SimulatorConfig, result: RunResult) -> SweepResult:
+        if (result.rejection_probability() <= negligible_rejection):
+            group = point.group()
+            resolved[group] = min(resolved.get(group, point.buffer_capacity), point.buffer_capacity)
+        return SweepResult(point, config, result)
+
+    if (max_workers == 1):
+        for point in points:
+            if (not is_skipped(point)):
+                config = point_config(base_config, point)
+                yield finish(point, config, run(config, law, seed))
+        return
+
+    # Points are submitted lazily, at most one per worker, and checked before submitting. A result
+    # is yielded once every smaller capacity of its group is done, so a point that turns out to be
+    # skipped is dropped and the points yielded are the same as in a serial sweep.
+    window = max_workers or os.cpu_count() or 1
+    unsubmitted = deque(points)
+    unyielded: Dict[Tuple[Tuple[int, ...], float], Deque[SweepPoint]] = {}
+    for point in points:
+        unyielded.setdefault(point.group(), deque()).append(point)
+    running: Dict[Future, SweepPoint] = {}
+    done: Dict[SweepPoint, RunResult] = {}
+    with ProcessPoolExecutor(max_workers) as executor:
+        while (unsubmitted or running):
+            while (unsubmitted and len(running) < window):
+                point = unsubmitted.popleft()
+                if (not is_skipped(point)):
+                    running[executor.submit(run, point_config(base_config, point), law, seed)] = point
+            if (not running):
+                continue
+
+            (finished, _) = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                point = running.pop(future)
+                if (not is_skipped(point)):
+                    done[point] = future.result()
+            for queue in unyielded.values():
+                while (queue and (queue[0] in done or is_skipped(queue[0]))):
+                    point = queue.popleft()
+                    if (point in done):
+                        result = done.pop(point)
+                        if (not is_skipped(point)):
+                            yield finish(point, point_config(base_config, point), result)
+            for future, point in list(running.items()):
+                if (is_skipped(point) and future.cancel()):
+                    del running[future]
+
+def sweep_table(results: Iterable[SweepResult]) -> Dict[str, list]:
+    # Column-oriented table, ready for pandas.DataFrame
+    table: Dict[str, list] = {
+        "buffer_capacity": [],
+        "devices_amount": [],
+        "device_coefficients": [],
+        "period_scale": [],
+        "seed": [],
+        "requests": [],
+        "rejected": [],
+        "rejection_probability": [],
+        "avg_buffer_time": [],
+        "utilization": [],
+        "simulation_time": []
+    }
+    for item in results:
+        (point, result) = (item.point, item.result)
+        table["buffer_capacity"].append(point.buffer_capacity)
+        table["devices_amount"].append(len(point.device_coefficients))
+        table["device_coefficients"].append(point.device_coefficients)
+        table["period_scale"].append(point.period_scale)
+        table["seed"].append(result.seed)
+        table["requests"].append(result.amount_of_requests)
+        table["rejected"].append(result.rejected_amount)
+        table["rejection_probability"].append(result.rejection_probability())
+        table["avg_buffer_time"].append(result.avg_buffer_time())
+        table["utilization"].append(result.utilization())
+        table["simulation_time"].append(result.simulation_time)
+    return table
@@ -0,0 +1,161 @@
+import argparse
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Sequence
+
+from my_simulator import MySimulator, SimulatorConfig, SimulatorLaw, load_config
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUNDLED_CONFIGS = ["test.json", "pick_up_point.json"]
+AXIS_VALUES = [1, 10, 100, 1000, 10000]
+BUFFER_VALUES = [0, 10, 100, 1000, 10000]
+BASE_SOURCES = 10
+BASE_DEVICES = 10
+BASE_BUFFER = 10
+TARGET_LOAD = 0.9
+DEFAULT_REQUESTS = 20000
+DEFAULT_SEED = 1
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    law: str
+    sources: int
+    devices: int
+    buffer_capacity: int
+    requests: int
+    events: int = 0
+    wall_time: float = 0.0
+    events_per_sec: float = 0.0
+    peak_memory_bytes: Optional[int] = None
+
+def synthetic_config(sources: int, devices: int, buffer_capacity: int, requests: int) -> SimulatorConfig:
+    # Equal sources and devices, sized so the offered load stays near TARGET_LOAD
+    period = max(10, sources)
+    coefficient = max(1, round(TARGET_LOAD * devices * period / sources))
+    return SimulatorConfig(
+        buffer_capacity=buffer_capacity,
+        target_amount_of_requests=requests,
+        source_periods=(period,) * sources,
+        device_coefficients=(coefficient,) * devices,
+        seed=DEFAULT_SEED
+    )
+
+def build_matrix(requests: int, full: bool) -> List[tuple]:
+    if (full):
+        points = itertools.product(AXIS_VALUES, AXIS_VALUES, BUFFER_VALUES)
+    else:
+        # One factor at a time around the base point
+        points = set()
+        points.update((s, BASE_DEVICES, BASE_BUFFER) for s in AXIS_VALUES)
+        points.update((BASE_SOURCES, d, BASE_BUFFER) for d in AXIS_VALUES)
+        points.update((BASE_SOURCES, BASE_DEVICES, b) for b in BUFFER_VALUES)
+        points = sorted(points)
+
+    matrix = []
+    for (sources, devices, buffer_capacity) in points:
+        name = f"s{sources}-d{devices}-b{buffer_capacity}"
+        matrix.append((name, synthetic_config(sources, devices, buffer_capacity, requests)))
+    for file_name in BUNDLED_CONFIGS:
+        config = replace(load_config(os.path.join(REPO_ROOT, file_name)), target_amount_of_requests=requests)
+        matrix.append((file_name, replace(config, seed=DEFAULT_SEED)))
+    return matrix
+
+def run_case(name: str, config: SimulatorConfig, law: SimulatorLaw, repeat: int, memory: bool) -> BenchmarkCase:
+    case = BenchmarkCase(
+        name=name,
+        law=law.name.lower(),
+        sources=len(config.source_periods),
+        devices=len(config.device_coefficients),
+        buffer_capacity=config.buffer_capacity,
+        requests=config.target_amount_of_requests
+    )
+
+    best = None
+    for _ in range(repeat):
+        sim = MySimulator(config, law)
+        start = time.perf_counter()
+        sim.run_to_completion()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    # Every request is generated once and every accepted request is released once
+    case.events = 2 * sim.current_amount_of_requests - sim.rejected_amount
+    case.wall_time = best
+    case.events_per_sec = case.events / best if best > 0 else 0.0
+
+    if (memory):
+        tracemalloc.start()
+        sim = MySimulator(config, law)
+        sim.run_to_completion()
+        (_, case.peak_memory_bytes) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return case
+
+def git_commit() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+def compare(baseline: Dict, current: Dict) -> None:
+    previous = {(case["name"], case["law"]): case for case in baseline["cases"]}
+    for case in current["cases"]:
+        old = previous.get((case["name"], case["law"]))
+        if (old is None or old["events_per_sec"] == 0):
+            continue
+        ratio = case["events_per_sec"] / old["events_per_sec"]
+        print(f"{case['name']:>24} {case['law']:>13} {old['events_per_sec']:>12.0f} -> {case['events_per_sec']:>12.0f} ev/s  x{ratio:.2f}")
+
+def parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the simulation core")
+    parser.add_argument("-o", "--output", default="bench_output.json", help="result file")
+    parser.add_argument("-n", "--requests", type=int, default=DEFAULT_REQUESTS, help="requests per run")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="timed runs per case, the best is kept")
+    parser.add_argument("--full", action="store_true", help="full cartesian matrix instead of one factor at a time")
+    parser.add_argument("--no-memory", action="store_false", dest="memory", help="skip the peak memory pass")
+    parser.add_argument("--filter", default=None, help="only run cases whose name contains this text")
+    parser.add_argument("--compare", default=None, help="earlier result file to compare against")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    cases = []
+    for (name, config) in build_matrix(args.requests, args.full):
+        if (args.filter is not None and args.filter not in name):
+            continue
+        for law in SimulatorLaw:
+            case = run_case(name, config, law, args.repeat, args.memory)
+            print(f"{case.name:>24} {case.law:>13} {case.events_per_sec:>12.0f} ev/s {case.wall_time:>9.3f} s", flush=True)
+            cases.append(asdict(case))
+
+    result = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "requests": args.requests,
+        "repeat": args.repeat,
+        "cases": cases
+    }
+    with open(args.output, 'w') as f:
+        json.dump(result, f, indent=4)
+
+    if (args.compare is not None):
+        with open(args.compare, 'r') as f:
+            compare(json.load(f), result)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
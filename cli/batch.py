@@ -0,0 +1,92 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from cli.report import REPORT_COLUMNS, build_report
+from my_simulator import MySimulator, SimulatorLaw, load_config
+
+Report = Dict[str, List[list]]
+
+
+def run_config(file_name: str, law: SimulatorLaw, seed: Optional[int]) -> Tuple[str, Report]:
+    sim = MySimulator(load_config(file_name), law, seed)
+    sim.run_to_completion()
+    return (file_name, build_report(sim))
+
+def run_configs(file_names: Sequence[str], law: SimulatorLaw, seed: Optional[int], jobs: int) -> List[Tuple[str, Report]]:
+    laws = [law] * len(file_names)
+    seeds = [seed] * len(file_names)
+    if (jobs <= 1 or len(file_names) == 1):
+        return list(map(run_config, file_names, laws, seeds))
+    with ProcessPoolExecutor(jobs) as executor:
+        return list(executor.map(run_config, file_names, laws, seeds))
+
+def report_as_json(report: Report) -> dict:
+    return {
+        part: [dict(zip(REPORT_COLUMNS[part], row)) for row in rows]
+        for part, rows in report.items()
+    }
+
+def write_json(file_name: str, report: Report, output_dir: str) -> None:
+    path = os.path.join(output_dir, f"{config_stem(file_name)}.report.json")
+    with open(path, 'w') as f:
+        json.dump(report_as_json(report), f, indent=4)
+
+def write_csv(file_name: str, report: Report, output_dir: str) -> None:
+    for part, rows in report.items():
+        path = os.path.join(output_dir, f"{config_stem(file_name)}.{part}.csv")
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(REPORT_COLUMNS[part])
+            writer.writerows(rows)
+
+def config_stem(file_name: str) -> str:
+    return os.path.splitext(os.path.basename(file_name))[0]
+
+def parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run simulations headlessly and write their reports")
+    parser.add_argument("configs", nargs="+", help="JSON configuration files")
+    parser.add_argument("--law", choices=[law.name.lower() for law in SimulatorLaw], default="stochastic")
+    parser.add_argument("--seed", type=int, default=None, help="seed overriding the one in the configuration")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="amount of worker processes")
+    parser.add_argument("-f", "--format", choices=["json", "csv"], default="json")
+    parser.add_argument("-o", "--output", default=None, help="directory for report files, stdout when omitted")
+    parser.add_argument("--print", action="store_true", dest="print_tables", help="print report tables")
+    args = parser.parse_args(argv)
+    # A report is written as one CSV file per table, which has no single stream form
+    if (args.format == "csv" and args.output is None):
+        parser.error("--format csv needs an output directory, pass -o")
+    return args
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    law = SimulatorLaw[args.law.upper()]
+    results = run_configs(args.configs, law, args.seed, args.jobs)
+
+    if (args.print_tables):
+        # tabulate is only needed for tables, so it is not imported on the common path
+        from cli.print_simulator import print_report_data
+        for file_name, report in results:
+            print(f"{file_name}:")
+            print_report_data(report)
+
+    if (args.output is None):
+        if (not args.print_tables):
+            json.dump({file_name: report_as_json(report) for file_name, report in results}, sys.stdout, indent=4)
+            print()
+        return 0
+
+    os.makedirs(args.output, exist_ok=True)
+    for file_name, report in results:
+        if (args.format == "json"):
+            write_json(file_name, report, args.output)
+        else:
+            write_csv(file_name, report, args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,12 @@
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from tabulate import tabulate
+from cli.report import (
+    BUFFER_HEADERS, BUSY_DEVICES_HEADERS, DEVICE_HEADERS, GENERAL_HEADERS, SOURCE_HEADERS, 
+    buffer_report_rows, build_report, busy_devices_report_rows, device_report_rows, 
+    general_report_rows, source_report_rows
+)
 from my_simulator import MySimulator
-from simulator import Request, SpecialEvent, SpecialEventType, MAX_TIME
+from simulator import Request, SpecialEvent, SpecialEventType, StepDelta, MAX_TIME
 
 def print_simulation_state(sim: MySimulator) -> None:
     print("Sources calendar:")
@@ -41,6 +46,28 @@ def print_fake_buffer(sim: MySimulator) -> None:
     table = [value_row]
     print(tabulate(tabular_data=table, headers=index_row))
     
+def print_step_delta(delta: StepDelta) -> None:
+    print_event(delta.event)
+    if (delta.sources):
+        print("Changed sources:")
+        rows = []
+        for i, source_stat in delta.sources.items():
+            time, sign = get_time_and_sign(source_stat.next_request_time)
+            rows.append([i, time, sign])
+        print(tabulate(tabular_data=rows, headers=["i", "Next event", "Sign"]))
+    if (delta.devices):
+        print("Changed devices:")
+        rows = []
+        for i, device_stat in delta.devices.items():
+            time, sign = get_time_and_sign(device_stat.next_request_time)
+            rows.append([i, time, sign, format_request(device_stat.current_request)])
+        print(tabulate(tabular_data=rows, headers=["i", "Next event", "Sign", "Request"]))
+    if (delta.buffer_slots):
+        print("Changed buffer slots:")
+        index_row = ["i:"] + list(delta.buffer_slots.keys())
+        value_row = ["Values:"] + [format_request(request) for request in delta.buffer_slots.values()]
+        print(tabulate(tabular_data=[value_row], headers=index_row))
+
 def print_event(event: SpecialEvent) -> None:
     print(f"Time: {event.planned_time}")
     match (event.event_type):
@@ -52,67 +79,34 @@ def print_event(event: SpecialEvent) -> None:
             print("Simulation ended")
 
 def print_report(sim: MySimulator) -> None:
+    print_report_data(build_report(sim))
+
+def print_report_data(report: Dict[str, List[list]]) -> None:
     print("General report:")
-    print_general_report(sim)
+    print(tabulate(tabular_data=report["general"], headers=GENERAL_HEADERS))
     print("Source report:")
-    print_source_report(sim)
+    print(tabulate(tabular_data=report["sources"], headers=SOURCE_HEADERS))
     print("Device report:")
-    print_device_report(sim)
+    print(tabulate(tabular_data=report["devices"], headers=DEVICE_HEADERS))
+    print("Buffer report:")
+    print(tabulate(tabular_data=report["buffer"], headers=BUFFER_HEADERS))
+    print("Busy devices report:")
+    print(tabulate(tabular_data=report["busy_devices"], headers=BUSY_DEVICES_HEADERS))
 
 def print_general_report(sim: MySimulator) -> None:
-    headers = [
-        "Total\nsimulation\ntime", 
-        "Requests\nrecieved", 
-        "Requests\nprocessed", 
-        "Requests\nrejected", 
-        "Rejection\nprobability"
-    ]
-    recieved = sim.current_amount_of_requests
-    rejected = sim.rejected_amount
-    table = [[
-        sim.current_simulation_time, 
-        recieved, 
-        recieved - rejected, 
-        rejected, 
-        rejected / recieved
-    ]]
-    print(tabulate(tabular_data=table, headers=headers))
+    print(tabulate(tabular_data=general_report_rows(sim), headers=GENERAL_HEADERS))
 
 def print_source_report(sim: MySimulator) -> None:
-    headers = [
-        "i", 
-        "Request\namount", 
-        "Rejection\nprobability", 
-        "Time\nfull", 
-        "Time\nbuffer", 
-        "Time\nprocessing", 
-        "Variance\nbuffer", 
-        "Variance\nprocessing"
-    ]
-    rows = []
-    for i, source_stat in enumerate(sim.source_statistics):
-        buffer_time = source_stat.avg_buffer_time()
-        device_time = source_stat.avg_device_time()
-        rows.append([
-            i, 
-            source_stat.generated, 
-            source_stat.rejected / source_stat.generated,
-            buffer_time + device_time,
-            buffer_time,
-            device_time,
-            source_stat.variance_buffer_time(),
-            source_stat.variance_device_time()
-        ])
-
-    print(tabulate(tabular_data=rows, headers=headers))
+    print(tabulate(tabular_data=source_report_rows(sim), headers=SOURCE_HEADERS))
 
 def print_device_report(sim: MySimulator) -> None:
-    headers = ["i", "Usage\ncoefficient"]
-    rows = []
-    for i, device_stat in enumerate(sim.device_statistics):
-        rows.append([i, device_stat.time_in_usage / sim.current_simulation_time])
-    
-    print(tabulate(tabular_data=rows, headers=headers))
+    print(tabulate(tabular_data=device_report_rows(sim), headers=DEVICE_HEADERS))
+
+def print_buffer_report(sim: MySimulator) -> None:
+    print(tabulate(tabular_data=buffer_report_rows(sim), headers=BUFFER_HEADERS))
+
+def print_busy_devices_report(sim: MySimulator) -> None:
+    print(tabulate(tabular_data=busy_devices_report_rows(sim), headers=BUSY_DEVICES_HEADERS))
 
 def get_time_and_sign(request_time: int) -> Tuple[Optional[int], int]:
     if (request_time == MAX_TIME):
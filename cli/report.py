@@ -0,0 +1,117 @@
+from typing import Dict, List
+
+from my_simulator import MySimulator
+
+GENERAL_HEADERS = [
+    "Total\nsimulation\ntime", 
+    "Requests\nrecieved", 
+    "Requests\nprocessed", 
+    "Requests\nrejected", 
+    "Rejection\nprobability", 
+    "Buffer\noccupancy\nmean", 
+    "Buffer\noccupancy\nmax", 
+    "Busy\ndevices\nmean"
+]
+GENERAL_COLUMNS = [
+    "total_simulation_time", 
+    "requests_recieved", 
+    "requests_processed", 
+    "requests_rejected", 
+    "rejection_probability", 
+    "buffer_occupancy_mean", 
+    "buffer_occupancy_max", 
+    "busy_devices_mean"
+]
+
+SOURCE_HEADERS = [
+    "i", 
+    "Request\namount", 
+    "Rejection\nprobability", 
+    "Time\nfull", 
+    "Time\nbuffer", 
+    "Time\nprocessing", 
+    "Variance\nbuffer", 
+    "Variance\nprocessing"
+]
+SOURCE_COLUMNS = [
+    "source", 
+    "request_amount", 
+    "rejection_probability", 
+    "time_full", 
+    "time_buffer", 
+    "time_processing", 
+    "variance_buffer", 
+    "variance_processing"
+]
+
+DEVICE_HEADERS = ["i", "Usage\ncoefficient"]
+DEVICE_COLUMNS = ["device", "usage_coefficient"]
+
+BUFFER_HEADERS = ["Slot", "Occupancy\ncoefficient"]
+BUFFER_COLUMNS = ["slot", "occupancy_coefficient"]
+
+BUSY_DEVICES_HEADERS = ["Busy\ndevices", "Time\nshare"]
+BUSY_DEVICES_COLUMNS = ["busy_devices", "time_share"]
+
+REPORT_COLUMNS: Dict[str, List[str]] = {
+    "general": GENERAL_COLUMNS,
+    "sources": SOURCE_COLUMNS,
+    "devices": DEVICE_COLUMNS, 
+    "buffer": BUFFER_COLUMNS, 
+    "busy_devices": BUSY_DEVICES_COLUMNS
+}
+
+def general_report_rows(sim: MySimulator) -> List[list]:
+    recieved = sim.observed_amount_of_requests
+    rejected = sim.observed_rejected_amount
+    return [[
+        sim.observed_simulation_time, 
+        recieved, 
+        recieved - rejected, 
+        rejected, 
+        rejected / recieved, 
+        sim.buffer_occupancy.mean(), 
+        sim.buffer_occupancy.max_level, 
+        sim.busy_devices.mean()
+    ]]
+
+def source_report_rows(sim: MySimulator) -> List[list]:
+    rows = []
+    for i, source_stat in enumerate(sim.source_statistics):
+        buffer_time = source_stat.avg_buffer_time()
+        device_time = source_stat.avg_device_time()
+        rows.append([
+            i, 
+            source_stat.generated, 
+            source_stat.rejected / source_stat.generated,
+            buffer_time + device_time,
+            buffer_time,
+            device_time,
+            source_stat.variance_buffer_time(),
+            source_stat.variance_device_time()
+        ])
+    return rows
+
+def device_report_rows(sim: MySimulator) -> List[list]:
+    rows = []
+    for i, device_stat in enumerate(sim.device_statistics):
+        rows.append([i, device_stat.time_in_usage / sim.observed_simulation_time])
+    return rows
+
+def buffer_report_rows(sim: MySimulator) -> List[list]:
+    rows = []
+    for i, occupied_time in enumerate(sim.slot_occupancy_times()):
+        rows.append([i, occupied_time / sim.observed_simulation_time])
+    return rows
+
+def busy_devices_report_rows(sim: MySimulator) -> List[list]:
+    return [[busy, share] for busy, share in enumerate(sim.busy_devices.distribution())]
+
+def build_report(sim: MySimulator) -> Dict[str, List[list]]:
+    return {
+        "general": general_report_rows(sim),
+        "sources": source_report_rows(sim),
+        "devices": device_report_rows(sim),
+        "buffer": buffer_report_rows(sim),
+        "busy_devices": busy_devices_report_rows(sim)
+    }
@@ -2,10 +2,13 @@ from collections import deque
 from copy import copy, deepcopy
 from dataclasses import dataclass
 from enum import Enum
-from random import Random
-from typing import Callable, Deque, List, Optional, Tuple
+import heapq
+import json
+from typing import Callable, Deque, List, Optional, Sequence, Tuple
 
-from simulator import Request, SpecialEvent, SpecialEventType, Simulator, DeviceStatistics
+from simulator import Request, SpecialEvent, SpecialEventType, Simulator, DeviceStatistics, PriorityBuffer
+from simulator.variates import DEFAULT_BLOCK_SIZE, ExponentialStream, IndexedVariates
+from simulator.views import ReadOnlyList, copy_request
 
 
 @dataclass(frozen=True)
@@ -14,29 +17,84 @@ class SimulatorConfig:
     target_amount_of_requests: int
     source_periods: Tuple[int]
     device_coefficients: Tuple[int]
+    seed: Optional[int] = None
+    # Processing times drawn per request instead of per device, so configurations that
+    # share a seed see the same work for the same request; antithetic mirrors those draws
+    common_random_numbers: bool = False
+    antithetic: bool = False
+
+def load_config(file_name: str) -> SimulatorConfig:
+    with open(file_name, 'r') as f:
+        config_dict = json.load(f)
+    return SimulatorConfig(
+        target_amount_of_requests = config_dict['requests'],
+        buffer_capacity = config_dict['buffer'],
+        source_periods = tuple(config_dict['sources']),
+        device_coefficients = tuple(config_dict['devices']),
+        seed = config_dict.get('seed'), 
+        common_random_numbers = config_dict.get('common_random_numbers', False), 
+        antithetic = config_dict.get('antithetic', False)
+    )
 
 class SimulatorLaw(Enum):
     STOCHASTIC = 0
     DETERMINISTIC = 1
 
 class MySimulator(Simulator):
-    def __init__(self, config: SimulatorConfig, law: SimulatorLaw):
+    def __init__(
+        self, 
+        config: SimulatorConfig, 
+        law: SimulatorLaw, 
+        seed: Optional[int] = None, 
+        variate_block_size: int = DEFAULT_BLOCK_SIZE, 
+        quantiles: Optional[Sequence[float]] = None, 
+        precomputed_arrivals: bool = True
+    ):
         super().__init__(
             len(config.source_periods), 
             len(config.device_coefficients), 
-            config.target_amount_of_requests
+            config.target_amount_of_requests, 
+            quantiles
         )
         self._law: SimulatorLaw = law
-        self._rangom_gen: Random = Random()
+        self._seed: Optional[int] = seed if seed is not None else config.seed
+        self._variate_block_size: int = variate_block_size
+        self._precomputed_arrivals: bool = precomputed_arrivals
+
+        if (config.antithetic and not config.common_random_numbers):
+            raise ValueError("Antithetic variates need common random numbers")
+        self._common_random_numbers: bool = config.common_random_numbers
+        self._antithetic: bool = config.antithetic
 
         self._source_periods: List[int] = list(config.source_periods)
         self._device_coefficients: List[int] = list(config.device_coefficients)
         self._buffer_capacity: int = config.buffer_capacity
-        self._buffer: List[Optional[Request]] = [None for _ in range(config.buffer_capacity)]
+        self._buffer: PriorityBuffer = PriorityBuffer(config.buffer_capacity, len(self._source_periods))
+        self._free_devices: List[int] = list(range(len(self._device_coefficients)))
+        self._processing_streams: List[ExponentialStream] = self.__make_processing_streams()
+        self._request_variates: Optional[IndexedVariates] = self.__make_request_variates()
 
         self.__init_simulator()
 
+    def __make_processing_streams(self) -> List[ExponentialStream]:
+        return [self.__make_processing_stream(i) for i in range(len(self._device_coefficients))]
+
+    def __make_request_variates(self) -> Optional[IndexedVariates]:
+        if (not self._common_random_numbers):
+            return None
+        return IndexedVariates(self._seed, len(self._source_periods), self._antithetic)
+
+    def __make_processing_stream(self, device_id: int) -> ExponentialStream:
+        return ExponentialStream(self._seed, device_id, self._variate_block_size)
+
     def __init_simulator(self) -> None:
+        # The timeline needs at least one source and positive periods, other configurations
+        # keep their arrivals in the event heap
+        if (self._precomputed_arrivals and self._source_periods and min(self._source_periods) > 0):
+            # Source periods are constant, so the whole arrival timeline is known in advance
+            self._set_periodic_arrivals(self._source_periods, self._source_periods)
+            return
+
         for i, period in enumerate(self._source_periods):
             self._add_special_event(SpecialEvent(
                 period,
@@ -46,52 +104,108 @@ class MySimulator(Simulator):
 
     def reset(self, target_amount_of_requests: Optional[int] = None) -> None:
         super().reset(target_amount_of_requests)
-        self._buffer = [None for _ in range(self._buffer_capacity)]
+        self._buffer = PriorityBuffer(self._buffer_capacity, len(self._source_periods))
+        self._free_devices = list(range(len(self._device_coefficients)))
+        self._processing_streams = self.__make_processing_streams()
+        self._request_variates = self.__make_request_variates()
         self.__init_simulator()
 
+    # Keeps the state of the system but draws all further processing times from a new seed
+    def reseed(self, seed: Optional[int]) -> None:
+        self._seed = seed
+        self._processing_streams = self.__make_processing_streams()
+        self._request_variates = self.__make_request_variates()
+
+    # The random streams are not part of the state, so a restored run draws new processing times.
+    # With common random numbers they follow request numbers, which repeat, so reseed() as well.
+    def _save_state(self) -> Tuple:
+        return (super()._save_state(), self._buffer._save_state(), list(self._free_devices))
+
+    def _restore_state(self, state: Tuple) -> None:
+        (simulator_state, buffer_state, free_devices) = state
+        super()._restore_state(simulator_state)
+        self._buffer._restore_state(buffer_state)
+        self._free_devices = list(free_devices)
+
+    def reset_statistics(self) -> None:
+        super().reset_statistics()
+        self._buffer.restart_occupancy(self.current_simulation_time)
+
+    @property
+    def seed(self) -> Optional[int]:
+        return self._seed
+
+    @property
+    def law(self) -> SimulatorLaw:
+        return self._law
+
+    @property
+    def config(self) -> SimulatorConfig:
+        return SimulatorConfig(
+            buffer_capacity=self._buffer_capacity,
+            target_amount_of_requests=self.target_amount_of_requests,
+            source_periods=tuple(self._source_periods),
+            device_coefficients=tuple(self._device_coefficients),
+            seed=self._seed,
+            common_random_numbers=self._common_random_numbers,
+            antithetic=self._antithetic
+        )
+
     @property
     def buffer_capacity(self) -> int:
         return self._buffer_capacity
 
     @property
-    def buffer(self) -> List[Optional[Request]]:
-        return deepcopy(self._buffer)
+    def buffer(self) -> ReadOnlyList[Optional[Request], Optional[Request]]:
+        return ReadOnlyList(self._buffer.slots, copy_request)
+
+    def snapshot_buffer(self) -> List[Optional[Request]]:
+        return deepcopy(self._buffer.slots)
+
+    def slot_occupancy_times(self) -> List[int]:
+        return self._buffer.slot_occupancy_times(self.current_simulation_time)
     
     def add_new_device(self, avg_processing_time: int) -> None:
         self._device_coefficients.append(avg_processing_time)
         self._devices.append(DeviceStatistics())
+        heapq.heappush(self._free_devices, len(self._devices) - 1)
+        self._processing_streams.append(self.__make_processing_stream(len(self._devices) - 1))
     
     def _put_in_buffer(self, request: Request) -> Optional[Request]:
-        for i, buffer_val in enumerate(self._buffer):
-            if (buffer_val is None):
-                self._buffer[i] = request
-                return None
-        
-        return request
+        slot = self._buffer.put(request, self.current_simulation_time)
+        if (slot is None):
+            return request
+        self._mark_buffer_slot(slot, request)
+        return None
 
     def _take_from_buffer(self) -> Optional[Request]:
-        buffer_requests = [(i, req) for (i, req) in enumerate(self._buffer) if req is not None]
-        if (len(buffer_requests) == 0):
+        taken = self._buffer.take(self.current_simulation_time)
+        if (taken is None):
             return None
-        
-        buffer_requests.sort(key=lambda req: (req[1].source_id, req[1].generation_time))
-        (i, res) = buffer_requests[0]
-        self._buffer[i] = None
-        return res
+        (slot, request) = taken
+        self._mark_buffer_slot(slot, None)
+        return request
     
     def _pick_device(self) -> Optional[int]:
-        for i, device in enumerate(self._devices):
-            if (device.current_request is None):
-                return i
-            
-        return None
+        if (not self._free_devices):
+            return None
+        return self._free_devices[0]
+
+    def _on_device_occupied(self, device_id: int) -> None:
+        heapq.heappop(self._free_devices)
+
+    def _on_device_released(self, device_id: int) -> None:
+        heapq.heappush(self._free_devices, device_id)
     
     def _device_processing_time(self, device_id: int, request: Request) -> int:
         match (self._law):
             case SimulatorLaw.DETERMINISTIC:
                 return self._device_coefficients[device_id]
             case SimulatorLaw.STOCHASTIC:
-                return int(self._device_coefficients[device_id] * self._rangom_gen.expovariate(1.0))
+                if (self._request_variates is not None):
+                    work = self._request_variates.exponential(request.source_id, request.number)
+                    return int(self._device_coefficients[device_id] * work)
+                return int(self._device_coefficients[device_id] * self._processing_streams[device_id].next())
             
         assert False, "Not all SimulatorLaw cases are managed"
 
@@ -2,19 +2,26 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
+from dataclasses import replace
+from typing import Optional
+
+from analysis.device_search import find_min_devices
 from my_simulator import MySimulator
 from pyqt.report_window import ReportWindow
+from pyqt.worker import SimulationWorker, format_progress, start_worker
 
 class AutoDialog(QDialog):
     def __init__(self, simulator: MySimulator, parent: QWidget | None = None):
         super().__init__(parent)
         self.simulator = simulator
         self.parent = parent
+        self.worker: Optional[SimulationWorker] = None
+        self.worker_thread: Optional[QThread] = None
         self.initUI()
         
     def initUI(self):
         self.setWindowTitle('Параметры автоматического режима')
-        self.setFixedSize(400, 300)
+        self.setFixedSize(460, 420)
         
         layout = QVBoxLayout()
         
@@ -46,12 +53,27 @@ class AutoDialog(QDialog):
         self.limit_input.setValue(1000)
         limit_layout.addWidget(self.limit_input)
         limit_group.setLayout(limit_layout)
+
+        # Отбрасывание переходного периода
+        self.warmup_checkbox = QCheckBox('Отбрасывать переходный период (MSER-5)')
+
+        # Общие случайные числа для сравнения конфигураций, по умолчанию как в конфигурации
+        self.crn_checkbox = QCheckBox('Общие случайные числа для всех кандидатов')
+        self.crn_checkbox.setChecked(self.simulator.config.common_random_numbers)
+
+        # Остановка прогона, как только ясно, выше или ниже цели вероятность отказа
+        self.sequential_checkbox = QCheckBox('Последовательный тест (доверительный интервал) для кандидатов')
+        self.sequential_checkbox.setChecked(True)
+
+        # Ход расчёта
+        self.progress_label = QLabel('')
+        self.progress_label.setAlignment(Qt.AlignCenter)
         
         # Кнопки
         button_layout = QHBoxLayout()
-        calc_btn = QPushButton('Расчёт')
-        calc_btn.setFixedHeight(40)
-        calc_btn.clicked.connect(self.calculate)
+        self.calc_btn = QPushButton('Расчёт')
+        self.calc_btn.setFixedHeight(40)
+        self.calc_btn.clicked.connect(self.calculate)
         
         cancel_btn = QPushButton('Отмена')
         cancel_btn.setFixedHeight(40)
@@ -59,51 +81,78 @@ class AutoDialog(QDialog):
         
         button_layout.addWidget(cancel_btn)
         button_layout.addStretch()
-        button_layout.addWidget(calc_btn)
+        button_layout.addWidget(self.calc_btn)
         
         # Собираем все вместе
         layout.addWidget(prob_group)
         layout.addWidget(time_group)
         layout.addWidget(limit_group)
+        layout.addWidget(self.warmup_checkbox)
+        layout.addWidget(self.crn_checkbox)
+        layout.addWidget(self.sequential_checkbox)
+        layout.addWidget(self.progress_label)
         layout.addStretch()
         layout.addLayout(button_layout)
         
         self.setLayout(layout)
     
+    # Подбор идёт в отдельном потоке, «Отмена» во время расчёта останавливает только его
     def calculate(self):
-        # Здесь должна быть логика расчёта
         target_rejection_probability = self.prob_input.value()
         max_requests = self.limit_input.value()
         average_new_device_processing_time = self.time_input.value()
-        while (target_rejection_probability < calculate_trustworthy_probability(self.simulator, max_requests)):
-            self.simulator.reset()
-            self.simulator.add_new_device(average_new_device_processing_time)
+        config = replace(self.simulator.config, common_random_numbers=self.crn_checkbox.isChecked())
+        law = self.simulator.law
+        warmup = self.warmup_checkbox.isChecked()
+        sequential = self.sequential_checkbox.isChecked()
+        self.worker = SimulationWorker(lambda monitor: find_min_devices(
+            config, 
+            law, 
+            target_rejection_probability, 
+            average_new_device_processing_time, 
+            max_requests, 
+            warmup=warmup, 
+            sequential=sequential, 
+            monitor=monitor
+        ))
+        self.worker.progress.connect(self.show_progress)
+        self.worker.finished.connect(self.calculation_finished)
+        self.worker.cancelled.connect(self.calculation_stopped)
+        self.worker.failed.connect(self.calculation_failed)
+        self.calc_btn.setEnabled(False)
+        self.progress_label.setText('Расчёт...')
+        self.worker_thread = start_worker(self.worker)
+
+    def show_progress(self, events: int, rejection: float):
+        self.progress_label.setText(format_progress(events, rejection))
+
+    def calculation_finished(self, search):
+        self.worker = None
+        self.simulator = search.simulator
         
         self.report_window = ReportWindow(self.simulator)
         self.report_window.show()
         self.accept()
         self.parent.close()
 
-def calculate_trustworthy_probability(sim: MySimulator, max_requests: int) -> float:
-    next_requests = 0
-    prev_rejection = 0.0
-    current_rejection = -1.0
-    while (True):
-        prev_rejection = current_rejection
-        sim.run_to_completion()
-        current_requests = sim.target_amount_of_requests
-        current_rejection = sim.rejected_amount / current_requests
-        if (abs((current_rejection - prev_rejection) / prev_rejection) < 0.1 or current_requests == max_requests):
-            return current_rejection
-        
-        next_requests = int(calculate_next_target_amount_of_requests(current_rejection))
-        if (next_requests >= max_requests):
-            next_requests = max_requests
+    def calculation_stopped(self):
+        self.worker = None
+        self.calc_btn.setEnabled(True)
+        self.progress_label.setText('Расчёт остановлен')
+
+    def calculation_failed(self, message: str):
+        self.calculation_stopped()
+        QMessageBox.critical(self, 'Ошибка', f'Расчёт не удался: {message}')
 
-        sim.reset(next_requests)
+    # Закрытие окна тоже приходит сюда, во время расчёта оно только останавливает его
+    def reject(self):
+        if (self.worker is not None):
+            self.worker.cancel()
+            return
+        self.wait_worker()
+        super().reject()
 
-def calculate_next_target_amount_of_requests(rejection_probability: float) -> float:
-    t_a = 1.643
-    delta = 0.1
-    p = rejection_probability
-    return (t_a * t_a * (1 - p)) / (p * delta * delta)
\ No newline at end of file
+    def wait_worker(self):
+        if (self.worker_thread is not None):
+            self.worker_thread.quit()
+            self.worker_thread.wait()
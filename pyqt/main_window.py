@@ -1,9 +1,8 @@
-import json
 from typing import Optional
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
-from my_simulator import MySimulator, SimulatorConfig, SimulatorLaw
+from my_simulator import MySimulator, SimulatorConfig, SimulatorLaw, load_config
 from pyqt.auto_dialog import AutoDialog
 from pyqt.step_window import StepWindow
 
@@ -63,14 +62,7 @@ class MainWindow(QWidget):
         if file_name:
             self.file_label.setText(file_name)
             try:
-                with open(file_name, 'r') as f:
-                    config_dict = json.load(f)
-                    self.simulator_config = SimulatorConfig(
-                        target_amount_of_requests = config_dict['requests'],
-                        buffer_capacity = config_dict['buffer'],
-                        source_periods = config_dict['sources'],
-                        device_coefficients = config_dict['devices']
-                    )
+                self.simulator_config = load_config(file_name)
             except KeyError as e:
                 QMessageBox.critical(self, 'Ошибка', 'Неверная конфигурация')
             except Exception as e:
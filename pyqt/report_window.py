@@ -22,13 +22,16 @@ class ReportWindow(QWidget):
         self.report_table = QTableWidget()
         self.report_table.setEditTriggers(QTableWidget.NoEditTriggers)
         self.report_table.setRowCount(1)
-        self.report_table.setColumnCount(5)
+        self.report_table.setColumnCount(8)
         self.report_table.setHorizontalHeaderLabels([
             'Общее время симуляции', 
             'Запросов получено', 
             'Запросов обработано', 
             'Запросов отклонено', 
-            'Вероятность отказа'
+            'Вероятность отказа', 
+            'Средняя\n загрузка буффера', 
+            'Максимальная\n загрузка буффера', 
+            'Среднее число\n занятых приборов'
         ])
         self.report_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.report_table.verticalHeader().setVisible(False)
@@ -62,10 +65,39 @@ class ReportWindow(QWidget):
         devices_layout.addWidget(self.devices_report_table)
         devices_group.setLayout(devices_layout)
         
+        # Таблица "Ячейки буффера"
+        buffer_group = QGroupBox('Ячейки буффера')
+        buffer_layout = QVBoxLayout()
+        self.buffer_report_table = QTableWidget()
+        self.buffer_report_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.buffer_report_table.setColumnCount(2)
+        self.buffer_report_table.setHorizontalHeaderLabels(['Ячейка', 'Коэффициент занятости'])
+        self.buffer_report_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.buffer_report_table.verticalHeader().setVisible(False)
+        buffer_layout.addWidget(self.buffer_report_table)
+        buffer_group.setLayout(buffer_layout)
+
+        # Таблица "Занятые приборы"
+        busy_group = QGroupBox('Занятые приборы')
+        busy_layout = QVBoxLayout()
+        self.busy_report_table = QTableWidget()
+        self.busy_report_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.busy_report_table.setColumnCount(2)
+        self.busy_report_table.setHorizontalHeaderLabels(['Занято приборов', 'Доля времени'])
+        self.busy_report_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.busy_report_table.verticalHeader().setVisible(False)
+        busy_layout.addWidget(self.busy_report_table)
+        busy_group.setLayout(busy_layout)
+
+        occupancy_layout = QHBoxLayout()
+        occupancy_layout.addWidget(buffer_group)
+        occupancy_layout.addWidget(busy_group)
+
         # Собираем все вместе
         main_layout.addWidget(report_group)
         main_layout.addWidget(sources_group)
         main_layout.addWidget(devices_group)
+        main_layout.addLayout(occupancy_layout)
         
         self.setLayout(main_layout)
     
@@ -92,18 +124,37 @@ class ReportWindow(QWidget):
                 item = QTableWidgetItem(value)
                 item.setTextAlignment(Qt.AlignCenter)
                 self.devices_report_table.setItem(i, j, item)
+        # Заполняем таблицу "Ячейки буффера"
+        buffer_data = form_buffer_data(sim)
+        self.buffer_report_table.setRowCount(len(buffer_data))
+        for i, row in enumerate(buffer_data):
+            for j, value in enumerate(row):
+                item = QTableWidgetItem(value)
+                item.setTextAlignment(Qt.AlignCenter)
+                self.buffer_report_table.setItem(i, j, item)
+        # Заполняем таблицу "Занятые приборы"
+        busy_data = form_busy_devices_data(sim)
+        self.busy_report_table.setRowCount(len(busy_data))
+        for i, row in enumerate(busy_data):
+            for j, value in enumerate(row):
+                item = QTableWidgetItem(value)
+                item.setTextAlignment(Qt.AlignCenter)
+                self.busy_report_table.setItem(i, j, item)
 
 TABLE_ROUNDING = 3
 
 def form_report_data(sim: MySimulator) -> list[str]:
-    recieved = sim.current_amount_of_requests
-    rejected = sim.rejected_amount
+    recieved = sim.observed_amount_of_requests
+    rejected = sim.observed_rejected_amount
     report_data = [
-        sim.current_simulation_time, 
+        sim.observed_simulation_time, 
         recieved, 
         recieved - rejected, 
         rejected, 
-        round(rejected / recieved, TABLE_ROUNDING)
+        round(rejected / recieved, TABLE_ROUNDING), 
+        round(sim.buffer_occupancy.mean(), TABLE_ROUNDING), 
+        sim.buffer_occupancy.max_level, 
+        round(sim.busy_devices.mean(), TABLE_ROUNDING)
     ]
     return list(map(str, report_data))
 
@@ -129,6 +180,21 @@ def form_device_data(sim: MySimulator) -> list[list[str]]:
     for i, device_stat in enumerate(sim.device_statistics):
         device_data.append(list(map(str, [
             i, 
-            round(device_stat.time_in_usage / sim.current_simulation_time, TABLE_ROUNDING)
+            round(device_stat.time_in_usage / sim.observed_simulation_time, TABLE_ROUNDING)
+        ])))
+    return device_data
+
+def form_buffer_data(sim: MySimulator) -> list[list[str]]:
+    buffer_data = []
+    for i, occupied_time in enumerate(sim.slot_occupancy_times()):
+        buffer_data.append(list(map(str, [
+            i, 
+            round(occupied_time / sim.observed_simulation_time, TABLE_ROUNDING)
         ])))
-    return device_data
\ No newline at end of file
+    return buffer_data
+
+def form_busy_devices_data(sim: MySimulator) -> list[list[str]]:
+    busy_data = []
+    for busy, share in enumerate(sim.busy_devices.distribution()):
+        busy_data.append(list(map(str, [busy, round(share, TABLE_ROUNDING)])))
+    return busy_data
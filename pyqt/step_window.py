@@ -4,14 +4,22 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from my_simulator import MySimulator
 from pyqt.report_window import ReportWindow
+from pyqt.worker import SimulationWorker, format_progress, start_worker
 from simulator.components import Request, SpecialEvent, SpecialEventType
-from simulator.statistics import MAX_TIME
+from simulator.replay import Replay
+from simulator.statistics import MAX_TIME, DeviceStatistics, SourceStatistics
+from simulator.views import DeviceStatisticsView, RunSummary, SourceStatisticsView
+
+SKIP_EVENTS = 10000
 
 
 class StepWindow(QWidget):
     def __init__(self, simulator: MySimulator):
         super().__init__()
         self.simulator = simulator
+        self.replay = Replay(simulator)
+        self.worker: Optional[SimulationWorker] = None
+        self.worker_thread: Optional[QThread] = None
         self.init_UI()
         self.update_values()
         
@@ -99,14 +107,41 @@ class StepWindow(QWidget):
         self.end_btn = QPushButton('Конец симуляции')
         self.end_btn.setFixedSize(150, 40)
         self.end_btn.clicked.connect(self.end_simulation)
+
+        self.skip_btn = QPushButton(f'+{SKIP_EVENTS} событий')
+        self.skip_btn.setFixedSize(120, 40)
+        self.skip_btn.clicked.connect(self.skip_events)
+
+        self.cancel_btn = QPushButton('Остановить')
+        self.cancel_btn.setFixedSize(100, 40)
+        self.cancel_btn.clicked.connect(self.cancel_simulation)
+        self.cancel_btn.setVisible(False)
+
+        self.back_btn = QPushButton('Назад')
+        self.back_btn.setFixedSize(100, 40)
+        self.back_btn.clicked.connect(self.step_back)
+
+        # Переход к событию по номеру
+        self.seek_input = QSpinBox()
+        self.seek_input.setRange(0, 2 ** 31 - 1)
+        self.seek_input.setFixedHeight(40)
+        self.seek_btn = QPushButton('Перейти')
+        self.seek_btn.setFixedSize(100, 40)
+        self.seek_btn.clicked.connect(self.seek_simulation)
         
         self.report_btn = QPushButton('Отчёт')
         self.report_btn.setFixedSize(100, 40)
         self.report_btn.clicked.connect(self.show_report)
         self.report_btn.setEnabled(False)
         
+        button_layout.addWidget(self.back_btn)
         button_layout.addWidget(self.step_btn)
+        button_layout.addWidget(self.skip_btn)
         button_layout.addWidget(self.end_btn)
+        button_layout.addWidget(self.cancel_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(self.seek_input)
+        button_layout.addWidget(self.seek_btn)
         button_layout.addStretch()
         button_layout.addWidget(self.report_btn)
         
@@ -120,44 +155,128 @@ class StepWindow(QWidget):
 
     def update_values(self):
         for i, source_stat in enumerate(self.simulator.source_statistics):
-            time, sign = get_time_and_sign(source_stat.next_request_time)
-            row = [str(i), str(time) if time else '', str(sign), str(source_stat.rejected)]
-            for j, value in enumerate(row):
-                item = QTableWidgetItem(value)
-                item.setTextAlignment(Qt.AlignCenter)
-                self.sources_table.setItem(i, j, item)
+            self.update_source_row(i, source_stat)
         
         for i, device_stat in enumerate(self.simulator.device_statistics):
-            time, sign = get_time_and_sign(device_stat.next_request_time)
-            row = [str(i), str(time) if time else '', str(sign), format_request(device_stat.current_request)]
-            for j, value in enumerate(row):
-                item = QTableWidgetItem(value)
-                item.setTextAlignment(Qt.AlignCenter)
-                self.devices_table.setItem(i, j, item)
+            self.update_device_row(i, device_stat)
 
         for j, request in enumerate(self.simulator.buffer):
-            row = ['', '', '']
-            if request is not None:
-                row = list(map(str, [request.source_id, request.generation_time, request.number]))
-            for i, value in enumerate(row):
-                item = QTableWidgetItem(value)
-                item.setTextAlignment(Qt.AlignCenter)
-                self.buffer_table.setItem(i, j, item)
+            self.update_buffer_column(j, request)
+
+    def update_source_row(self, i: int, source_stat: SourceStatistics | SourceStatisticsView):
+        time, sign = get_time_and_sign(source_stat.next_request_time)
+        row = [str(i), str(time) if time else '', str(sign), str(source_stat.rejected)]
+        for j, value in enumerate(row):
+            set_cell(self.sources_table, i, j, value)
+
+    def update_device_row(self, i: int, device_stat: DeviceStatistics | DeviceStatisticsView):
+        time, sign = get_time_and_sign(device_stat.next_request_time)
+        row = [str(i), str(time) if time else '', str(sign), format_request(device_stat.current_request)]
+        for j, value in enumerate(row):
+            set_cell(self.devices_table, i, j, value)
+
+    def update_buffer_column(self, j: int, request: Optional[Request]):
+        row = ['', '', '']
+        if request is not None:
+            row = list(map(str, [request.source_id, request.generation_time, request.number]))
+        for i, value in enumerate(row):
+            set_cell(self.buffer_table, i, j, value)
     
     def step_simulation(self):
-        event = self.simulator.step()
+        delta = self.replay.step_with_delta()
+        event = delta.event
         self.time_label.setText(str(event.planned_time))
         self.event_label.setText(format_event(event))
-        self.update_values()
+        for i, source_stat in delta.sources.items():
+            self.update_source_row(i, source_stat)
+        for i, device_stat in delta.devices.items():
+            self.update_device_row(i, device_stat)
+        for j, request in delta.buffer_slots.items():
+            self.update_buffer_column(j, request)
         if (event.event_type == SpecialEventType.END_OF_SIMULATION):
             self.handle_end()
     
+    # Пропуск пачки событий без отрисовки каждого шага
+    def skip_events(self):
+        summary = self.replay.run_for(SKIP_EVENTS)
+        self.time_label.setText(str(self.simulator.current_simulation_time))
+        self.event_label.setText(format_summary(summary))
+        self.update_values()
+        if (self.simulator.is_completed()):
+            self.handle_end()
+
+    # Прогон до конца идёт в отдельном потоке, пока он работает, окно не трогает симулятор
     def end_simulation(self):
-        self.simulator.run_to_completion()
+        replay = self.replay
+        self.run_start_index = replay.event_index
+        self.worker = SimulationWorker(lambda monitor: monitor.run_to_completion(replay.simulator, replay.run_for))
+        self.worker.progress.connect(self.show_progress)
+        self.worker.finished.connect(self.simulation_finished)
+        self.worker.cancelled.connect(self.simulation_cancelled)
+        self.worker.failed.connect(self.simulation_failed)
+        self.set_running(True)
+        self.worker_thread = start_worker(self.worker)
+
+    def cancel_simulation(self):
+        if (self.worker is not None):
+            self.cancel_btn.setEnabled(False)
+            self.worker.cancel()
+
+    def show_progress(self, events: int, rejection: float):
+        self.event_label.setText(format_progress(self.run_start_index + events, rejection))
+
+    def simulation_finished(self, _):
+        self.set_running(False)
         self.time_label.setText(str(self.simulator.current_simulation_time))
         self.event_label.setText("Симуляция окончена")
         self.update_values()
         self.handle_end()
+
+    def simulation_cancelled(self):
+        self.set_running(False)
+        self.seek_to(self.replay.event_index)
+
+    def simulation_failed(self, message: str):
+        self.set_running(False)
+        self.seek_to(self.replay.event_index)
+        QMessageBox.critical(self, 'Ошибка', f'Симуляция прервана: {message}')
+
+    def set_running(self, running: bool):
+        for button in (self.back_btn, self.step_btn, self.skip_btn, self.end_btn, self.seek_btn, self.report_btn):
+            button.setEnabled(not running)
+        self.cancel_btn.setEnabled(running)
+        self.cancel_btn.setVisible(running)
+        if (not running):
+            self.worker = None
+
+    def closeEvent(self, event: QCloseEvent):
+        if (self.worker is not None):
+            self.worker.cancel()
+        if (self.worker_thread is not None):
+            self.worker_thread.quit()
+            self.worker_thread.wait()
+        super().closeEvent(event)
+
+    def step_back(self):
+        if (self.replay.event_index > 0):
+            self.seek_to(self.replay.event_index - 1)
+
+    def seek_simulation(self):
+        self.seek_to(self.seek_input.value())
+
+    def seek_to(self, event_index: int):
+        self.replay.seek(event_index)
+        self.simulator = self.replay.simulator
+        self.time_label.setText(str(self.simulator.current_simulation_time))
+        self.event_label.setText(f"Событие {self.replay.event_index}")
+        self.update_values()
+        if (self.simulator.is_completed()):
+            self.handle_end()
+        else:
+            self.step_btn.setEnabled(True)
+            self.skip_btn.setEnabled(True)
+            self.end_btn.setEnabled(True)
+            self.report_btn.setEnabled(False)
     
     def show_report(self):
         self.report_window = ReportWindow(self.simulator)
@@ -166,9 +285,19 @@ class StepWindow(QWidget):
 
     def handle_end(self):
         self.step_btn.setEnabled(False)
+        self.skip_btn.setEnabled(False)
         self.end_btn.setEnabled(False)
         self.report_btn.setEnabled(True)
 
+def set_cell(table: QTableWidget, row: int, column: int, value: str):
+    item = table.item(row, column)
+    if (item is None):
+        item = QTableWidgetItem(value)
+        item.setTextAlignment(Qt.AlignCenter)
+        table.setItem(row, column, item)
+    elif (item.text() != value):
+        item.setText(value)
+
 def get_time_and_sign(request_time: int) -> tuple[Optional[int], int]:
     if (request_time == MAX_TIME):
         return (None, 1)
@@ -180,6 +309,12 @@ def format_request(request: Optional[Request]) -> str:
         return ""
     return f"{request.source_id}-{request.number}"
 
+def format_summary(summary: RunSummary) -> str:
+    return (
+        f"Событий: {summary.events}, отказов: {summary.rejected}, "
+        f"прошло времени: {summary.time_advanced}"
+    )
+
 def format_event(event: SpecialEvent) -> str:
     match (event.event_type):
         case SpecialEventType.GENERATE_NEW_REQUEST:
@@ -0,0 +1,45 @@
+from typing import Callable
+from PyQt5.QtCore import *
+
+from analysis.progress import ProgressMonitor, RunCancelled
+
+
+# Выполняет задачу в отдельном потоке. Задача получает монитор, через который
+# сообщает о прогрессе и проверяет отмену между пачками событий.
+class SimulationWorker(QObject):
+    progress = pyqtSignal(int, float)
+    finished = pyqtSignal(object)
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, job: Callable[[ProgressMonitor], object]):
+        super().__init__()
+        self.job = job
+        # Сигнал из рабочего потока доставляется в поток интерфейса через очередь
+        self.monitor = ProgressMonitor(self.progress.emit)
+
+    def run(self):
+        try:
+            result = self.job(self.monitor)
+        except RunCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(result)
+
+    def cancel(self):
+        self.monitor.cancel()
+
+def start_worker(worker: SimulationWorker) -> QThread:
+    thread = QThread()
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    worker.finished.connect(thread.quit)
+    worker.cancelled.connect(thread.quit)
+    worker.failed.connect(thread.quit)
+    thread.start()
+    return thread
+
+def format_progress(events: int, rejection: float) -> str:
+    return f"Событий: {events}, вероятность отказа: {rejection:.6f}"
@@ -1,13 +1,42 @@
 from .components import Request, SpecialEventType, SpecialEvent
-from .simulator import Simulator
-from .statistics import SourceStatistics, DeviceStatistics, MAX_TIME
+from .simulator import Simulator, ENGINE_VERSION
+from .buffer import PriorityBuffer
+from .statistics import SourceStatistics, DeviceStatistics, OccupancyStatistics, MAX_TIME
+from .quantiles import QuantileSketch, P2Quantile
+from .replay import Replay
+from .warmup import Mser5Detector
+from .sequential import SequentialRejectionTest
+from .profiling import SimulatorProfile, HandlerProfile
+from .trace import TraceRecorder, TraceOutcome, load_trace, iter_trace
+from .views import ReadOnlyList, SourceStatisticsView, DeviceStatisticsView, ElementStatisticsView, OccupancyStatisticsView, StepDelta, RunSummary
 
 __all__ = [
     'Request',
     'SpecialEventType',
     'SpecialEvent',
     'Simulator',
+    'ENGINE_VERSION',
+    'PriorityBuffer',
     'SourceStatistics',
     'DeviceStatistics',
-    'MAX_TIME'
+    'OccupancyStatistics',
+    'MAX_TIME',
+    'QuantileSketch',
+    'P2Quantile',
+    'ReadOnlyList',
+    'SourceStatisticsView',
+    'DeviceStatisticsView',
+    'ElementStatisticsView',
+    'OccupancyStatisticsView',
+    'StepDelta',
+    'RunSummary',
+    'Replay',
+    'Mser5Detector',
+    'SequentialRejectionTest',
+    'SimulatorProfile',
+    'HandlerProfile',
+    'TraceRecorder',
+    'TraceOutcome',
+    'load_trace',
+    'iter_trace'
 ]
\ No newline at end of file
@@ -0,0 +1,109 @@
+from itertools import repeat
+from math import ceil
+from typing import Final, List, Sequence, Tuple
+
+from simulator.statistics import MAX_TIME
+from simulator.variates import _numpy
+
+DEFAULT_CHUNK_ARRIVALS: Final[int] = 4096
+
+
+# Merged timeline of strictly periodic sources, ordered by (time, source id) like
+# GENERATE_NEW_REQUEST events in the event heap. Arrivals are generated a time window at a
+# time, sized to hold about chunk_arrivals of them, and sorted in one go.
+class PeriodicArrivals:
+
+    def __init__(
+        self,
+        periods: Sequence[int],
+        first_times: Sequence[int],
+        chunk_arrivals: int = DEFAULT_CHUNK_ARRIVALS
+    ):
+        if (len(periods) == 0 or min(periods) < 1):
+            raise ValueError("Every source needs a positive period")
+        self._periods: List[int] = list(periods)
+        self._next_times: List[int] = list(first_times)
+        self._window: int = max(1, ceil(chunk_arrivals / sum(1 / period for period in self._periods)))
+        self._chunk: List[Tuple[int, int]] = []
+        self._position: int = 0
+        self._suspended: bool = False
+        self.__refill()
+        self.next_time: int = self._chunk[0][0]
+
+    @property
+    def suspended(self) -> bool:
+        return self._suspended
+
+    def pop(self) -> Tuple[int, int]:
+        arrival = self._chunk[self._position]
+        self._position += 1
+        if (self._position == len(self._chunk)):
+            self.__refill()
+        self.next_time = self._chunk[self._position][0]
+        return arrival
+
+    def suspend(self) -> None:
+        self._suspended = True
+        self.next_time = MAX_TIME
+
+    def resume(self, shift: int) -> None:
+        if (shift != 0):
+            self._chunk = [(time + shift, source_id) for (time, source_id) in self._chunk[self._position:]]
+            self._position = 0
+            self._next_times = [time + shift for time in self._next_times]
+        self._suspended = False
+        self.next_time = self._chunk[self._position][0]
+
+    # Chunks are never changed in place, only replaced, so copies and saved states can share
+    # them. This keeps checkpoints of a simulator cheap.
+    def __deepcopy__(self, memo: dict) -> 'PeriodicArrivals':
+        copy = PeriodicArrivals.__new__(PeriodicArrivals)
+        copy.__dict__.update(self.__dict__)
+        copy._next_times = list(self._next_times)
+        memo[id(self)] = copy
+        return copy
+
+    # Position in the timeline, _restore_state() may be called any number of times with it
+    def _save_state(self) -> Tuple:
+        return (self._chunk, self._position, list(self._next_times), self._suspended, self.next_time)
+
+    def _restore_state(self, state: Tuple) -> None:
+        (self._chunk, self._position, next_times, self._suspended, self.next_time) = state
+        self._next_times = list(next_times)
+
+    # Time of the earliest pending arrival of every source
+    def pending_times(self) -> List[int]:
+        pending = list(self._next_times)
+        for (time, source_id) in reversed(self._chunk[self._position:]):
+            pending[source_id] = time
+        return pending
+
+    def __refill(self) -> None:
+        end = max(min(self._next_times) + 1, min(self._next_times) + self._window)
+        numpy = _numpy()
+        if (numpy is not None):
+            self._chunk = self.__numpy_chunk(numpy, end)
+        else:
+            self._chunk = self.__python_chunk(end)
+        self._position = 0
+
+    def __python_chunk(self, end: int) -> List[Tuple[int, int]]:
+        chunk = []
+        for source_id, (time, period) in enumerate(zip(self._next_times, self._periods)):
+            if (time < end):
+                times = range(time, end, period)
+                chunk.extend(zip(times, repeat(source_id)))
+                self._next_times[source_id] = time + len(times) * period
+        chunk.sort()
+        return chunk
+
+    def __numpy_chunk(self, numpy, end: int) -> List[Tuple[int, int]]:
+        next_times = numpy.array(self._next_times, dtype=numpy.int64)
+        periods = numpy.array(self._periods, dtype=numpy.int64)
+        counts = numpy.maximum(0, -((next_times - end) // periods))
+        sources = numpy.repeat(numpy.arange(len(periods)), counts)
+        starts = numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        times = next_times[sources] + (numpy.arange(len(sources)) - starts) * periods[sources]
+        order = numpy.lexsort((sources, times))
+        self._next_times = (next_times + counts * periods).tolist()
+        return list(zip(times[order].tolist(), sources[order].tolist()))
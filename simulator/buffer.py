@@ -0,0 +1,88 @@
+from collections import deque
+import heapq
+from typing import Deque, List, Optional, Tuple
+
+from simulator.components import Request
+
+
+# Requests wait in per-source FIFO queues and are taken by (source_id, generation_time).
+# Free slots are kept in a min-heap, so a request always lands in the lowest free slot.
+# The time each slot spends occupied is summed as requests leave it.
+class PriorityBuffer:
+
+    def __init__(self, capacity: int, sources_amount: int):
+        self._slots: List[Optional[Request]] = [None for _ in range(capacity)]
+        self._free_slots: List[int] = list(range(capacity))
+        self._queues: List[Deque[Tuple[int, Request]]] = [deque() for _ in range(sources_amount)]
+        self._waiting_sources: List[int] = []
+        self._size = 0
+        self._occupied_since: List[int] = [0 for _ in range(capacity)]
+        self._occupied_time: List[int] = [0 for _ in range(capacity)]
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._slots)
+
+    @property
+    def slots(self) -> List[Optional[Request]]:
+        return self._slots
+
+    def slot_occupancy_times(self, time: int) -> List[int]:
+        occupancy = list(self._occupied_time)
+        for slot, request in enumerate(self._slots):
+            if (request is not None):
+                occupancy[slot] += time - self._occupied_since[slot]
+        return occupancy
+
+    def restart_occupancy(self, time: int) -> None:
+        self._occupied_time = [0 for _ in range(len(self._slots))]
+        self._occupied_since = [time for _ in range(len(self._slots))]
+
+    # Contents of the buffer without the occupancy times. Requests are shared with the state,
+    # _restore_state() may be called any number of times with it.
+    def _save_state(self) -> Tuple:
+        return (
+            list(self._slots),
+            list(self._free_slots),
+            [deque(queue) for queue in self._queues],
+            list(self._waiting_sources),
+            self._size
+        )
+
+    def _restore_state(self, state: Tuple) -> None:
+        (slots, free_slots, queues, waiting_sources, self._size) = state
+        self._slots[:] = slots
+        self._free_slots = list(free_slots)
+        self._queues = [deque(queue) for queue in queues]
+        self._waiting_sources = list(waiting_sources)
+
+    def put(self, request: Request, time: int) -> Optional[int]:
+        if (not self._free_slots):
+            return None
+
+        slot = heapq.heappop(self._free_slots)
+        self._slots[slot] = request
+        self._occupied_since[slot] = time
+        queue = self._queues[request.source_id]
+        if (not queue):
+            heapq.heappush(self._waiting_sources, request.source_id)
+        queue.append((slot, request))
+        self._size += 1
+        return slot
+
+    def take(self, time: int) -> Optional[Tuple[int, Request]]:
+        if (not self._waiting_sources):
+            return None
+
+        queue = self._queues[self._waiting_sources[0]]
+        (slot, request) = queue.popleft()
+        if (not queue):
+            heapq.heappop(self._waiting_sources)
+        self._slots[slot] = None
+        self._occupied_time[slot] += time - self._occupied_since[slot]
+        heapq.heappush(self._free_slots, slot)
+        self._size -= 1
+        return (slot, request)
@@ -0,0 +1,20 @@
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+@dataclass
+class HandlerProfile:
+    calls: int = 0
+    total_ns: int = 0
+
+    def avg_ns(self) -> float:
+        return self.total_ns / self.calls if self.calls else 0.0
+
+# Call counts and inclusive wall time per hot-path handler, plus the largest event heap seen
+@dataclass
+class SimulatorProfile:
+    handlers: Dict[str, HandlerProfile] = field(default_factory=dict)
+    peak_heap_size: int = 0
+
+    def handler(self, name: str) -> HandlerProfile:
+        return self.handlers.setdefault(name, HandlerProfile())
@@ -0,0 +1,120 @@
+from bisect import insort
+from typing import Dict, Final, List, Optional, Sequence, Tuple
+
+DEFAULT_QUANTILES: Final[Tuple[float, ...]] = (0.5, 0.95, 0.99)
+
+
+# P² estimate of a single quantile (Jain and Chlamtac, 1985). Five markers are kept and
+# moved with piecewise-parabolic interpolation, so memory and time per sample are O(1).
+class P2Quantile:
+    __slots__ = ('_p', '_count', '_heights', '_positions', '_desired', '_increments')
+
+    def __init__(self, p: float):
+        if (not 0 < p < 1):
+            raise ValueError("Quantile must be between 0 and 1")
+        self._p: float = p
+        self._count: int = 0
+        self._heights: List[float] = []
+        self._positions: List[int] = [1, 2, 3, 4, 5]
+        self._desired: List[float] = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self._increments: List[float] = [0, p / 2, p, (1 + p) / 2, 1]
+
+    @property
+    def p(self) -> float:
+        return self._p
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def add(self, value: float) -> None:
+        self._count += 1
+        heights = self._heights
+        if (self._count <= 5):
+            insort(heights, value)
+            return
+
+        positions = self._positions
+        if (value < heights[0]):
+            heights[0] = value
+            cell = 0
+        elif (value >= heights[4]):
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while (value >= heights[cell + 1]):
+                cell += 1
+
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        desired = self._desired
+        for i in range(5):
+            desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            offset = desired[i] - positions[i]
+            if ((offset >= 1 and positions[i + 1] - positions[i] > 1)
+                or (offset <= -1 and positions[i - 1] - positions[i] < -1)):
+                direction = 1 if offset > 0 else -1
+                height = self.__parabolic(i, direction)
+                if (not heights[i - 1] < height < heights[i + 1]):
+                    height = self.__linear(i, direction)
+                heights[i] = height
+                positions[i] += direction
+
+    def value(self) -> Optional[float]:
+        if (self._count == 0):
+            return None
+        if (self._count <= 5):
+            # Exact nearest-rank quantile while the markers are still being filled
+            return self._heights[min(int(self._p * self._count), self._count - 1)]
+        return self._heights[2]
+
+    def __parabolic(self, i: int, direction: int) -> float:
+        heights = self._heights
+        positions = self._positions
+        return heights[i] + direction / (positions[i + 1] - positions[i - 1]) * (
+            (positions[i] - positions[i - 1] + direction) * (heights[i + 1] - heights[i]) / (positions[i + 1] - positions[i])
+            + (positions[i + 1] - positions[i] - direction) * (heights[i] - heights[i - 1]) / (positions[i] - positions[i - 1])
+        )
+
+    def __linear(self, i: int, direction: int) -> float:
+        heights = self._heights
+        positions = self._positions
+        return heights[i] + direction * (heights[i + direction] - heights[i]) / (positions[i + direction] - positions[i])
+
+    def __eq__(self, other: object) -> bool:
+        if (not isinstance(other, P2Quantile)):
+            return NotImplemented
+        return (self._p, self._count, self._heights, self._positions) == (other._p, other._count, other._heights, other._positions)
+
+# Several P² estimators fed with the same samples
+class QuantileSketch:
+    __slots__ = ('_estimators',)
+
+    def __init__(self, quantiles: Sequence[float] = DEFAULT_QUANTILES):
+        self._estimators: Dict[float, P2Quantile] = {p: P2Quantile(p) for p in quantiles}
+
+    @property
+    def quantiles(self) -> Tuple[float, ...]:
+        return tuple(self._estimators)
+
+    @property
+    def count(self) -> int:
+        return next(iter(self._estimators.values())).count if self._estimators else 0
+
+    def add(self, value: float) -> None:
+        for estimator in self._estimators.values():
+            estimator.add(value)
+
+    def quantile(self, p: float) -> Optional[float]:
+        estimator = self._estimators.get(p)
+        if (estimator is None):
+            raise KeyError(f"Quantile {p} is not tracked")
+        return estimator.value()
+
+    def __eq__(self, other: object) -> bool:
+        if (not isinstance(other, QuantileSketch)):
+            return NotImplemented
+        return self._estimators == other._estimators
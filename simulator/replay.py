@@ -0,0 +1,94 @@
+from copy import deepcopy
+from typing import Final, Generic, List, Optional, TypeVar
+
+from simulator.components import SpecialEvent, SpecialEventType
+from simulator.simulator import Simulator
+from simulator.views import RunSummary, StepDelta
+
+DEFAULT_CHECKPOINT_INTERVAL: Final[int] = 10000
+
+S = TypeVar('S', bound=Simulator)
+
+
+# Steps a simulator while keeping a deep copy of its state every checkpoint_interval events.
+# Seeking restores the nearest checkpoint at or before the target and re-simulates the gap,
+# so any already visited event is reached in at most checkpoint_interval steps.
+class Replay(Generic[S]):
+
+    def __init__(self, simulator: S, checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL):
+        if (checkpoint_interval < 1):
+            raise ValueError("Checkpoint interval must be positive")
+        if (simulator.trace is not None):
+            raise ValueError("Traced simulators can not be replayed")
+        if (simulator.profile is not None):
+            raise ValueError("Profiled simulators can not be replayed")
+
+        self._simulator: S = simulator
+        self._checkpoint_interval: int = checkpoint_interval
+        self._event_index: int = 0
+        self._checkpoints: List[S] = [deepcopy(simulator)]
+
+    @property
+    def simulator(self) -> S:
+        return self._simulator
+
+    @property
+    def event_index(self) -> int:
+        return self._event_index
+
+    @property
+    def checkpoint_interval(self) -> int:
+        return self._checkpoint_interval
+
+    def step(self) -> SpecialEvent:
+        event = self._simulator.step()
+        if (event.event_type != SpecialEventType.END_OF_SIMULATION):
+            self.__advance()
+        return event
+
+    def step_with_delta(self) -> StepDelta:
+        delta = self._simulator.step_with_delta()
+        if (delta.event.event_type != SpecialEventType.END_OF_SIMULATION):
+            self.__advance()
+        return delta
+
+    # Runs in chunks that end at checkpoint boundaries, so checkpoints are taken
+    # at the same events as when stepping one by one
+    def run_for(self, n_events: int) -> RunSummary:
+        if (n_events < 0):
+            raise ValueError("Amount of events must not be negative")
+
+        summary: Optional[RunSummary] = None
+        remaining = n_events
+        while (True):
+            next_checkpoint = len(self._checkpoints) * self._checkpoint_interval
+            chunk = self._simulator.run_for(min(remaining, next_checkpoint - self._event_index))
+            summary = chunk if summary is None else summary.merge(chunk)
+            remaining -= chunk.events
+            self._event_index += chunk.events
+            if (self._event_index == next_checkpoint):
+                self._checkpoints.append(deepcopy(self._simulator))
+            if (remaining == 0 or self._simulator.is_completed()):
+                return summary
+
+    def run_to_completion(self) -> None:
+        while (not self._simulator.is_completed()):
+            self.run_for(self._checkpoint_interval)
+
+    def seek(self, event_index: int) -> None:
+        if (event_index < 0):
+            raise ValueError("Event index must not be negative")
+
+        checkpoint = min(event_index // self._checkpoint_interval, len(self._checkpoints) - 1)
+        checkpoint_index = checkpoint * self._checkpoint_interval
+        if (not (checkpoint_index <= self._event_index <= event_index)):
+            self._simulator = deepcopy(self._checkpoints[checkpoint])
+            self._event_index = checkpoint_index
+
+        if (self._event_index < event_index):
+            self.run_for(event_index - self._event_index)
+
+    def __advance(self) -> None:
+        self._event_index += 1
+        if (self._event_index == len(self._checkpoints) * self._checkpoint_interval):
+            self._checkpoints.append(deepcopy(self._simulator))
@@ -0,0 +1,114 @@
+from math import sqrt
+from statistics import NormalDist
+from typing import Final, List, Optional
+
+DEFAULT_RELATIVE_INDIFFERENCE: Final[float] = 0.1
+DEFAULT_ERROR_PROBABILITY: Final[float] = 0.05
+DEFAULT_BATCHES: Final[int] = 20
+DEFAULT_MIN_OBSERVATIONS: Final[int] = 1000
+DEFAULT_MIN_REJECTIONS: Final[int] = 30
+# The interval is checked again each time the amount of observations grows by this factor,
+# so a long run makes only logarithmically many looks at the data
+CHECK_GROWTH: Final[float] = 1.25
+
+
+# Sequential confidence interval test of the rejection probability against a target. Rejections
+# come in bursts, so the interval is taken over batch means, with between batches and 2 * batches
+# of them: once there are 2 * batches, neighbours are merged and the batch size doubles. Batches
+# thus grow with the run and stay long compared with the bursts. The test stops once the interval
+# lies above target * (1 + indifference) or below target * (1 - indifference), so the further the
+# probability is from the target, the sooner it stops. The variance of a batch mean is never taken
+# below the binomial one at the bound being tested, which keeps the interval honest while every
+# batch is still zero. Bursts also make a handful of rejections say little about the rate, so a
+# decision needs min_rejections of them: seen, for "above", or expected at the lower bound, for
+# "below". No decision is made before min_observations requests either.
+class SequentialRejectionTest:
+
+    def __init__(
+        self,
+        target_probability: float,
+        relative_indifference: float = DEFAULT_RELATIVE_INDIFFERENCE,
+        alpha: float = DEFAULT_ERROR_PROBABILITY,
+        batches: int = DEFAULT_BATCHES,
+        min_observations: int = DEFAULT_MIN_OBSERVATIONS,
+        min_rejections: int = DEFAULT_MIN_REJECTIONS
+    ):
+        if (not 0 < target_probability < 1):
+            raise ValueError("Target probability must be between 0 and 1")
+        if (not 0 < relative_indifference < 1):
+            raise ValueError("Relative indifference must be between 0 and 1")
+        if (not 0 < alpha < 0.5):
+            raise ValueError("Error probability must be between 0 and 0.5")
+        if (batches < 2 or min_observations < 2 * batches):
+            raise ValueError("At least two batches of at least one observation are needed")
+
+        self._target_probability: float = target_probability
+        self._lower: float = target_probability * (1 - relative_indifference)
+        self._upper: float = target_probability * (1 + relative_indifference)
+        # One-sided quantile, each look can be wrong only in one direction
+        self._z: float = NormalDist().inv_cdf(1 - alpha)
+        self._max_batches: int = 2 * batches
+        self._batch_size: int = max(1, min_observations // self._max_batches)
+        self._next_check: int = min_observations
+        self._min_rejections: int = min_rejections
+        self._rejections: int = 0
+        self._batch_rejections: int = 0
+        self._batch_count: int = 0
+        self._means: List[float] = []
+        self._observations: int = 0
+        self._exceeds_target: Optional[bool] = None
+
+    @property
+    def target_probability(self) -> float:
+        return self._target_probability
+
+    @property
+    def observations(self) -> int:
+        return self._observations
+
+    # True when the rejection probability is above the target, False when below,
+    # None while the test is not settled
+    @property
+    def exceeds_target(self) -> Optional[bool]:
+        return self._exceeds_target
+
+    @property
+    def decided(self) -> bool:
+        return self._exceeds_target is not None
+
+    def observe(self, rejected: bool) -> bool:
+        self._observations += 1
+        if (rejected):
+            self._rejections += 1
+            self._batch_rejections += 1
+        self._batch_count += 1
+        if (self._batch_count < self._batch_size or self._exceeds_target is not None):
+            return False
+
+        self._means.append(self._batch_rejections / self._batch_size)
+        self._batch_rejections = 0
+        self._batch_count = 0
+        if (len(self._means) == self._max_batches):
+            means = self._means
+            self._means = [(means[i] + means[i + 1]) / 2 for i in range(0, len(means), 2)]
+            self._batch_size *= 2
+        if (self._observations < self._next_check):
+            return False
+
+        self._next_check = int(self._observations * CHECK_GROWTH)
+        amount = len(self._means)
+        mean = sum(self._means) / amount
+        variance = sum((value - mean) ** 2 for value in self._means) / (amount - 1)
+        if (self._rejections >= self._min_rejections
+            and mean - self.__half_width(variance, self._upper, amount) > self._upper):
+            self._exceeds_target = True
+        elif (self._observations * self._lower >= self._min_rejections
+            and mean + self.__half_width(variance, self._lower, amount) < self._lower):
+            self._exceeds_target = False
+        else:
+            return False
+        return True
+
+    def __half_width(self, variance: float, bound: float, amount: int) -> float:
+        binomial = bound * (1 - bound) / self._batch_size
+        return self._z * sqrt(max(variance, binomial) / amount)
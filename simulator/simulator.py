@@ -1,46 +1,322 @@
 from abc import ABC, abstractmethod
 from copy import deepcopy
 import heapq
-from typing import List, Optional
+import time
+from typing import Callable, Dict, Final, List, Optional, Sequence, Set, Tuple
 
+from simulator.arrivals import PeriodicArrivals
 from simulator.components import Request, SpecialEvent, SpecialEventType
-from simulator.statistics import MAX_TIME, DeviceStatistics, SourceStatistics
+from simulator.profiling import HandlerProfile, SimulatorProfile
+from simulator.quantiles import QuantileSketch
+from simulator.sequential import SequentialRejectionTest
+from simulator.statistics import MAX_TIME, DeviceStatistics, ElementStatistics, OccupancyStatistics, SourceStatistics
+from simulator.trace import TraceOutcome, TraceRecorder
+from simulator.views import (
+    DeviceStatisticsView, OccupancyStatisticsView, ReadOnlyList, RunSummary, SourceStatisticsView, StepDelta, copy_request
+)
+from simulator.warmup import Mser5Detector
+
+# Bumped whenever a change to the event loop changes the results of a seeded run
+ENGINE_VERSION: Final[int] = 2
+
+# Instance attributes replaced by timing wrappers while profiling is enabled
+PROFILED_HANDLERS: Final[Dict[str, str]] = {
+    '_Simulator__handle_new_request': 'handle_new_request',
+    '_Simulator__handle_device_release': 'handle_device_release',
+    '_Simulator__occupy_next_device': 'occupy_next_device',
+    '_put_in_buffer': 'put_in_buffer',
+    '_take_from_buffer': 'take_from_buffer',
+    '_pick_device': 'pick_device',
+    '_device_processing_time': 'device_processing_time',
+    '_source_period': 'source_period'
+}
+
+
+class _StepChanges:
+    __slots__ = ('sources', 'devices', 'buffer_slots', 'request')
+
+    def __init__(self):
+        self.sources: Set[int] = set()
+        self.devices: Set[int] = set()
+        self.buffer_slots: Dict[int, Optional[Request]] = {}
+        self.request: Optional[Request] = None
 
 
 class Simulator(ABC):
 
-    def __init__(self, sources_amount: int, devices_amount: int, target_amount_of_requests: int):
+    def __init__(
+        self, 
+        sources_amount: int, 
+        devices_amount: int, 
+        target_amount_of_requests: int, 
+        quantiles: Optional[Sequence[float]] = None
+    ):
         super().__init__()
-        self._sources: List[SourceStatistics] = [SourceStatistics() for _ in range(sources_amount)]
+        self.__quantiles: Optional[Tuple[float, ...]] = None if quantiles is None else tuple(quantiles)
+        self._sources: List[SourceStatistics] = [self.__new_source_statistics() for _ in range(sources_amount)]
         self._devices: List[DeviceStatistics] = [DeviceStatistics() for _ in range(devices_amount)]
-        self.__special_events: List[SpecialEvent] = []
+        self.__buffer_occupancy = OccupancyStatistics()
+        self.__busy_devices = OccupancyStatistics()
+        self.__special_events: List[Tuple[int, SpecialEventType, int]] = []
+        self.__arrivals: Optional[PeriodicArrivals] = None
+        self.__suspended_events: List[Tuple[int, SpecialEventType, int]] = []
+        self.__termination_time: Optional[int] = None
         self.__current_amount_of_request = 0
         self.__target_amount_of_requests = target_amount_of_requests
         self.__rejected_amount = 0
         self.__current_simulation_time = 0
+        self.__changes: Optional[_StepChanges] = None
+        self.__trace: Optional[TraceRecorder] = None
+        self.__profile: Optional[SimulatorProfile] = None
+        self.__warmup: Optional[Mser5Detector] = None
+        self.__warmup_end_time: Optional[int] = None
+        self.__stopping_rule: Optional[SequentialRejectionTest] = None
+        self.__stop_requested = False
+        self.__observed_requests_offset = 0
+        self.__observed_rejected_offset = 0
+        self.__first_observed: Optional[List[int]] = None
                 
     def step(self) -> SpecialEvent:
         if (self.is_completed()):
-            return SpecialEvent(event_type=SpecialEventType.END_OF_SIMULATION)
-        return self.__step()
+            return SpecialEvent(self.__current_simulation_time, SpecialEventType.END_OF_SIMULATION, 0)
+        if (self.__trace is not None):
+            return SpecialEvent(*self.__traced_step())
+        return SpecialEvent(*self.__step())
+
+    def step_with_delta(self) -> StepDelta:
+        self.__changes = _StepChanges()
+        try:
+            event = self.step()
+            changes = self.__changes
+        finally:
+            self.__changes = None
+
+        return StepDelta(
+            event=event,
+            sources={i: deepcopy(self._sources[i]) for i in sorted(changes.sources)},
+            devices={i: deepcopy(self._devices[i]) for i in sorted(changes.devices)},
+            buffer_slots=dict(sorted(changes.buffer_slots.items()))
+        )
 
     def run_to_completion(self) -> None:
+        step = self.__step if self.__trace is None else self.__traced_step
         while (not self.is_completed()):
-            self.__step()
+            step()
+
+    # Bulk counterparts of step(): no SpecialEvent is built per event and the whole batch
+    # is described by one summary. Each of them stops early once the simulation completes.
+    def run_for(self, n_events: int) -> RunSummary:
+        if (n_events < 0):
+            raise ValueError("Amount of events must not be negative")
+        start = self.__batch_start()
+        step = self.__step if self.__trace is None else self.__traced_step
+        steps = 0
+        while (steps < n_events and not self.is_completed()):
+            step()
+            steps += 1
+        return self.__batch_summary(start, steps)
+
+    # Runs every event planned at or before time, the clock stays at the last event run
+    def run_until(self, time: int) -> RunSummary:
+        start = self.__batch_start()
+        step = self.__step if self.__trace is None else self.__traced_step
+        steps = 0
+        while (not self.is_completed() and self.__next_event_time() <= time):
+            step()
+            steps += 1
+        return self.__batch_summary(start, steps)
+
+    # The predicate is checked before every event
+    def run_while(self, predicate: Callable[['Simulator'], bool]) -> RunSummary:
+        start = self.__batch_start()
+        step = self.__step if self.__trace is None else self.__traced_step
+        steps = 0
+        while (not self.is_completed() and predicate(self)):
+            step()
+            steps += 1
+        return self.__batch_summary(start, steps)
+
+    def set_trace(self, trace: Optional[TraceRecorder]) -> None:
+        self.__trace = trace
+
+    @property
+    def trace(self) -> Optional[TraceRecorder]:
+        return self.__trace
+
+    # Profiling swaps timing wrappers in as instance attributes, so a simulator
+    # that never enables it runs the plain methods with no extra checks
+    def enable_profiling(self) -> SimulatorProfile:
+        if (self.__profile is not None):
+            return self.__profile
+
+        profile = SimulatorProfile(peak_heap_size=len(self.__special_events))
+        for attribute, name in PROFILED_HANDLERS.items():
+            setattr(self, attribute, _timed(getattr(self, attribute), profile.handler(name)))
+
+        schedule = self.__schedule
+        def measured_schedule(planned_time: int, event_type: SpecialEventType, event_id: int) -> None:
+            schedule(planned_time, event_type, event_id)
+            if (len(self.__special_events) > profile.peak_heap_size):
+                profile.peak_heap_size = len(self.__special_events)
+        self.__schedule = measured_schedule
+
+        self.__profile = profile
+        return profile
+
+    def disable_profiling(self) -> Optional[SimulatorProfile]:
+        profile = self.__profile
+        if (profile is None):
+            return None
+
+        for attribute in PROFILED_HANDLERS:
+            delattr(self, attribute)
+        del self.__schedule
+        self.__profile = None
+        return profile
+
+    @property
+    def profile(self) -> Optional[SimulatorProfile]:
+        return self.__profile
+
+    # The detector is fed every request leaving the buffer. Once it reports steady state
+    # the statistics are reset in place and the run goes on.
+    def set_warmup_detector(self, detector: Optional[Mser5Detector]) -> None:
+        self.__warmup = detector
+
+    @property
+    def warmup_detector(self) -> Optional[Mser5Detector]:
+        return self.__warmup
+
+    @property
+    def warmup_end_time(self) -> Optional[int]:
+        return self.__warmup_end_time
+
+    # The test is fed every request leaving the buffer after the warm-up, if one is detected.
+    # Once it is settled no new requests are generated, as if the target was reached.
+    def set_stopping_rule(self, rule: Optional[SequentialRejectionTest]) -> None:
+        self.__stopping_rule = rule
+
+    @property
+    def stopping_rule(self) -> Optional[SequentialRejectionTest]:
+        return self.__stopping_rule
+
+    # Drops everything accumulated so far while keeping the state of the system. Requests
+    # still in the system were generated before now and stay out of the source statistics.
+    def reset_statistics(self) -> None:
+        now = self.__current_simulation_time
+        offsets = self.__first_observed or [0] * len(self._sources)
+        self.__first_observed = [source.generated + offset for source, offset in zip(self._sources, offsets)]
+        for source in self._sources:
+            fresh = self.__new_source_statistics()
+            source.generated = 0
+            source.rejected = 0
+            source.buffer_stats = fresh.buffer_stats
+            source.device_stats = fresh.device_stats
+        for device in self._devices:
+            # Only the part of a running service that falls after now is kept
+            device.time_in_usage = 0 if device.current_request is None else device.next_request_time - now
+        self.__buffer_occupancy.restart(now)
+        self.__busy_devices.restart(now)
+        self.__observed_requests_offset = self.__current_amount_of_request
+        self.__observed_rejected_offset = self.__rejected_amount
+        self.__warmup_end_time = now
+        if (self.__changes is not None):
+            self.__changes.sources.update(range(len(self._sources)))
+            self.__changes.devices.update(range(len(self._devices)))
 
     def reset(self, target_amount_of_requests: Optional[int] = None) -> None:
-        self._sources = [SourceStatistics() for _ in range(len(self._sources))]
+        self._sources = [self.__new_source_statistics() for _ in range(len(self._sources))]
         self._devices = [DeviceStatistics() for _ in range(len(self._devices))]
+        self.__buffer_occupancy = OccupancyStatistics()
+        self.__busy_devices = OccupancyStatistics()
         self.__special_events = []
+        self.__arrivals = None
+        self.__suspended_events = []
+        self.__termination_time = None
         self.__current_amount_of_request = 0
         self.__rejected_amount = 0
         self.__current_simulation_time = 0
+        self.__warmup = None
+        self.__warmup_end_time = None
+        self.__stopping_rule = None
+        self.__stop_requested = False
+        self.__observed_requests_offset = 0
+        self.__observed_rejected_offset = 0
+        self.__first_observed = None
 
         if (target_amount_of_requests is not None):
             self.__target_amount_of_requests = target_amount_of_requests
 
+    def extend(self, target_amount_of_requests: int) -> None:
+        if (target_amount_of_requests <= self.__current_amount_of_request):
+            raise ValueError("New target amount of requests must exceed the amount already generated")
+
+        self.__target_amount_of_requests = target_amount_of_requests
+        self.__stop_requested = False
+        if (self.__termination_time is None):
+            return
+
+        # Sources resume with their phases kept, shifted by the time spent draining the system
+        shift = self.__current_simulation_time - self.__termination_time
+        if (self.__arrivals is not None):
+            self.__arrivals.resume(shift)
+            for source_id, planned_time in enumerate(self.__arrivals.pending_times()):
+                self.__set_next_arrival(source_id, planned_time)
+        for (planned_time, event_type, event_id) in self.__suspended_events:
+            self.__schedule(planned_time + shift, event_type, event_id)
+        self.__suspended_events = []
+        self.__termination_time = None
+
+    # Everything that decides how the run goes on: the clock, the counters, pending events and
+    # the requests held by devices. Statistics, the warm-up detector and the stopping rule are
+    # not part of it, so they are not rolled back and mean nothing once a state is restored.
+    # That only suits RESTART splitting in analysis.rare_event, which counts rejections itself,
+    # so these are not public. A state is restored only into the simulator it was saved from,
+    # any number of times.
+    def _save_state(self) -> Tuple:
+        return (
+            self.__current_simulation_time,
+            self.__current_amount_of_request,
+            self.__rejected_amount,
+            list(self.__special_events),
+            None if self.__arrivals is None else self.__arrivals._save_state(),
+            list(self.__suspended_events),
+            self.__termination_time,
+            self.__stop_requested,
+            [(source.generated, source.next_request_time) for source in self._sources],
+            [(device.current_request, device.next_request_time) for device in self._devices],
+            (self.__buffer_occupancy.level, self.__buffer_occupancy.last_change_time),
+            (self.__busy_devices.level, self.__busy_devices.last_change_time)
+        )
+
+    def _restore_state(self, state: Tuple) -> None:
+        (
+            self.__current_simulation_time,
+            self.__current_amount_of_request,
+            self.__rejected_amount,
+            special_events,
+            arrivals,
+            suspended_events,
+            self.__termination_time,
+            self.__stop_requested,
+            sources,
+            devices,
+            (self.__buffer_occupancy.level, self.__buffer_occupancy.last_change_time),
+            (self.__busy_devices.level, self.__busy_devices.last_change_time)
+        ) = state
+        self.__special_events = list(special_events)
+        if (arrivals is not None):
+            self.__arrivals._restore_state(arrivals)
+        self.__suspended_events = list(suspended_events)
+        for source, (generated, next_request_time) in zip(self._sources, sources):
+            source.generated = generated
+            source.next_request_time = next_request_time
+        for device, (current_request, next_request_time) in zip(self._devices, devices):
+            device.current_request = current_request
+            device.next_request_time = next_request_time
+
     def is_completed(self) -> bool:
-        return len(self.__special_events) == 0
+        return len(self.__special_events) == 0 and (self.__arrivals is None or self.__arrivals.suspended)
 
     @property
     def current_amount_of_requests(self) -> int:
@@ -57,13 +333,52 @@ class Simulator(ABC):
     @property   
     def current_simulation_time(self) -> int:
         return self.__current_simulation_time
+
+    # Counterparts of the totals above restricted to the time after the warm-up,
+    # equal to them when statistics were never reset
+    @property
+    def observed_amount_of_requests(self) -> int:
+        return self.__current_amount_of_request - self.__observed_requests_offset
+
+    @property
+    def observed_rejected_amount(self) -> int:
+        return self.__rejected_amount - self.__observed_rejected_offset
+
+    @property
+    def observed_simulation_time(self) -> int:
+        return self.__current_simulation_time - (self.__warmup_end_time or 0)
     
+    # Quantiles of buffer and processing time estimated per source, None when not tracked
     @property
-    def source_statistics(self) -> List[SourceStatistics]:
-        return deepcopy(self._sources)
+    def quantiles(self) -> Optional[Tuple[float, ...]]:
+        return self.__quantiles
+
+    @property
+    def source_statistics(self) -> ReadOnlyList[SourceStatistics, SourceStatisticsView]:
+        return ReadOnlyList(self._sources, SourceStatisticsView)
 
     @property
-    def device_statistics(self) -> List[DeviceStatistics]:
+    def device_statistics(self) -> ReadOnlyList[DeviceStatistics, DeviceStatisticsView]:
+        return ReadOnlyList(self._devices, DeviceStatisticsView)
+
+    # Time-weighted amount of requests in the buffer and of busy devices
+    @property
+    def buffer_occupancy(self) -> OccupancyStatisticsView:
+        return OccupancyStatisticsView(self.__buffer_occupancy, self.__current_simulation_time)
+
+    # buffer_occupancy.level without building a view, for loops that check it after every event
+    @property
+    def buffer_level(self) -> int:
+        return self.__buffer_occupancy.level
+
+    @property
+    def busy_devices(self) -> OccupancyStatisticsView:
+        return OccupancyStatisticsView(self.__busy_devices, self.__current_simulation_time)
+
+    def snapshot_source_statistics(self) -> List[SourceStatistics]:
+        return deepcopy(self._sources)
+
+    def snapshot_device_statistics(self) -> List[DeviceStatistics]:
         return deepcopy(self._devices)
 
     @abstractmethod
@@ -86,64 +401,236 @@ class Simulator(ABC):
     def _source_period(self, source_id: int) -> int:
         pass
 
+    def _on_device_occupied(self, device_id: int) -> None:
+        pass
+
+    def _on_device_released(self, device_id: int) -> None:
+        pass
+
+    def _mark_buffer_slot(self, slot: int, request: Optional[Request]) -> None:
+        if (self.__changes is not None):
+            self.__changes.buffer_slots[slot] = copy_request(request)
+
+    # Replaces per-arrival GENERATE_NEW_REQUEST events with a precomputed merged timeline,
+    # for subclasses whose _source_period is a constant per source. Arrivals are taken
+    # in the same order the heap would give, so results do not change.
+    def _set_periodic_arrivals(self, periods: Sequence[int], first_times: Sequence[int]) -> None:
+        self.__arrivals = PeriodicArrivals(periods, first_times)
+        for source_id, planned_time in enumerate(first_times):
+            self.__set_next_arrival(source_id, planned_time)
+
     def _add_special_event(self, event: SpecialEvent) -> None:
-        match event.event_type:
-            case SpecialEventType.GENERATE_NEW_REQUEST:
-                self._sources[event.event_id].next_request_time = event.planned_time
-            case SpecialEventType.DEVICE_RELEASE:
-                self._devices[event.event_id].next_request_time = event.planned_time
-        
-        heapq.heappush(self.__special_events, event)
+        self.__schedule(event.planned_time, event.event_type, event.event_id)
+
+    def __new_source_statistics(self) -> SourceStatistics:
+        if (self.__quantiles is None):
+            return SourceStatistics()
+        return SourceStatistics(
+            buffer_stats=ElementStatistics(sketch=QuantileSketch(self.__quantiles)),
+            device_stats=ElementStatistics(sketch=QuantileSketch(self.__quantiles))
+        )
+
+    # Events are kept as plain (planned_time, event_type, event_id) tuples, so heap
+    # comparisons run in C and SpecialEvent objects are built only by step()
+    def __schedule(self, planned_time: int, event_type: SpecialEventType, event_id: int) -> None:
+        if (event_type == SpecialEventType.GENERATE_NEW_REQUEST):
+            self._sources[event_id].next_request_time = planned_time
+            if (self.__changes is not None):
+                self.__changes.sources.add(event_id)
+        else:
+            self._devices[event_id].next_request_time = planned_time
+            if (self.__changes is not None):
+                self.__changes.devices.add(event_id)
+
+        heapq.heappush(self.__special_events, (planned_time, event_type, event_id))
+
+    def __set_next_arrival(self, source_id: int, planned_time: int) -> None:
+        self._sources[source_id].next_request_time = planned_time
+        if (self.__changes is not None):
+            self.__changes.sources.add(source_id)
+
+    def __next_event_time(self) -> int:
+        next_time = self.__special_events[0][0] if self.__special_events else MAX_TIME
+        if (self.__arrivals is not None and self.__arrivals.next_time < next_time):
+            return self.__arrivals.next_time
+        return next_time
+
+    def __batch_start(self) -> Tuple[int, int, int]:
+        return (self.__current_amount_of_request, self.__rejected_amount, self.__current_simulation_time)
+
+    # Every event either generates a request or releases a device, so the batch is
+    # summarised from the counters before and after it
+    def __batch_summary(self, start: Tuple[int, int, int], steps: int) -> RunSummary:
+        (requests_before, rejected_before, time_before) = start
+        generated = self.__current_amount_of_request - requests_before
+        return RunSummary(
+            event_counts={
+                SpecialEventType.GENERATE_NEW_REQUEST: generated, 
+                SpecialEventType.DEVICE_RELEASE: steps - generated
+            },
+            rejected=self.__rejected_amount - rejected_before,
+            start_time=time_before,
+            end_time=self.__current_simulation_time
+        )
+
+    def __step(self) -> Tuple[int, SpecialEventType, int]:
+        # Arrivals win ties, as GENERATE_NEW_REQUEST sorts before DEVICE_RELEASE in the heap
+        arrivals = self.__arrivals
+        if (arrivals is not None and (not self.__special_events or arrivals.next_time <= self.__special_events[0][0])):
+            (planned_time, source_id) = arrivals.pop()
+            self.__current_simulation_time = planned_time
+            self.__handle_new_request(source_id)
+            return (planned_time, SpecialEventType.GENERATE_NEW_REQUEST, source_id)
 
-    def __step(self) -> SpecialEvent:
         current_event = heapq.heappop(self.__special_events)
-        self.__current_simulation_time = current_event.planned_time
-        match current_event.event_type:
-            case SpecialEventType.GENERATE_NEW_REQUEST:
-                self.__handle_new_request(current_event.event_id)
-            case SpecialEventType.DEVICE_RELEASE:
-                self.__handle_device_release(current_event.event_id)
+        (planned_time, event_type, event_id) = current_event
+        self.__current_simulation_time = planned_time
+        if (event_type == SpecialEventType.GENERATE_NEW_REQUEST):
+            self.__handle_new_request(event_id)
+        else:
+            self.__handle_device_release(event_id)
         return current_event
 
+    # Runs one step with change tracking on and appends what it did to the trace
+    def __traced_step(self) -> Tuple[int, SpecialEventType, int]:
+        outer_changes = self.__changes
+        changes = _StepChanges() if outer_changes is None else outer_changes
+        rejected_before = self.__rejected_amount
+        self.__changes = changes
+        try:
+            event = self.__step()
+        finally:
+            self.__changes = outer_changes
+
+        (planned_time, event_type, event_id) = event
+        request = changes.request
+        slot = next(iter(changes.buffer_slots), -1)
+        if (event_type == SpecialEventType.GENERATE_NEW_REQUEST):
+            if (self.__rejected_amount > rejected_before):
+                outcome = TraceOutcome.REJECTED
+            elif (changes.buffer_slots):
+                outcome = TraceOutcome.BUFFERED
+            else:
+                outcome = TraceOutcome.SERVED
+        else:
+            outcome = TraceOutcome.DEVICE_IDLE if request is None else TraceOutcome.TAKEN_FROM_BUFFER
+        self.__trace.record(
+            planned_time, 
+            event_type, 
+            event_id, 
+            -1 if request is None else request.source_id, 
+            -1 if request is None else request.number, 
+            slot, 
+            outcome
+        )
+        return event
+
     def __handle_new_request(self, source_id: int) -> None:
         source = self._sources[source_id]
-        request = Request(source_id, source.generated, self.__current_simulation_time)
+        number = source.generated
+        if (self.__first_observed is not None):
+            # Numbering goes on across statistics resets
+            number += self.__first_observed[source_id]
+        request = Request(source_id, number, self.__current_simulation_time)
+        if (self.__changes is not None):
+            self.__changes.sources.add(source_id)
+            self.__changes.request = request
         source.generated += 1
         self.__current_amount_of_request += 1
         if (not self.__occupy_next_device(request)):
             rejected = self._put_in_buffer(request)
             if (rejected is not None):
                 self.__handle_buffer_overflow(rejected)
+            else:
+                self.__buffer_occupancy.change(self.__current_simulation_time, 1)
+        else:
+            # Served at once, so the request waited zero time
+            if (source.buffer_stats.sketch is not None):
+                source.buffer_stats.sketch.add(0)
+            if (self.__warmup is not None or self.__stopping_rule is not None):
+                self.__observe_request(0, False)
 
-        if (self.__current_amount_of_request >= self.__target_amount_of_requests):
-            self.__special_events = [event for event in self.__special_events if event.event_type != SpecialEventType.GENERATE_NEW_REQUEST]
-            for source in self._sources:
-                source.next_request_time = MAX_TIME
+        if (self.__current_amount_of_request >= self.__target_amount_of_requests or self.__stop_requested):
+            self.__terminate_arrivals(source_id)
+        elif (self.__arrivals is not None):
+            self.__set_next_arrival(source_id, self.__current_simulation_time + self._source_period(source_id))
         else:
-            self._add_special_event(SpecialEvent(
+            self.__schedule(
+                self.__current_simulation_time + self._source_period(source_id),
+                SpecialEventType.GENERATE_NEW_REQUEST,
+                source_id
+            )
+
+    # source_id is the source whose next arrival is not scheduled yet, if any
+    def __terminate_arrivals(self, source_id: Optional[int]) -> None:
+        self.__termination_time = self.__current_simulation_time
+        for source in self._sources:
+            source.next_request_time = MAX_TIME
+        if (self.__changes is not None):
+            self.__changes.sources.update(range(len(self._sources)))
+        if (self.__arrivals is not None):
+            self.__arrivals.suspend()
+            return
+
+        self.__suspended_events = [event for event in self.__special_events if event[1] == SpecialEventType.GENERATE_NEW_REQUEST]
+        if (source_id is not None):
+            self.__suspended_events.append((
                 self.__current_simulation_time + self._source_period(source_id),
                 SpecialEventType.GENERATE_NEW_REQUEST,
                 source_id
             ))
+        self.__special_events = [event for event in self.__special_events if event[1] != SpecialEventType.GENERATE_NEW_REQUEST]
+        heapq.heapify(self.__special_events)
 
     def __handle_buffer_overflow(self, request: Request) -> None:
         time = self.__current_simulation_time - request.generation_time
-        source = self._sources[request.source_id]
-        source.buffer_stats.add_time(time)
-        source.rejected += 1
         self.__rejected_amount += 1
+        if (self.__first_observed is not None and request.number < self.__first_observed[request.source_id]):
+            self.__observed_rejected_offset += 1
+        else:
+            source = self._sources[request.source_id]
+            source.buffer_stats.add_time(time)
+            source.rejected += 1
+            if (self.__changes is not None):
+                self.__changes.sources.add(request.source_id)
+        if (self.__warmup is not None or self.__stopping_rule is not None):
+            self.__observe_request(time, True)
 
     def __handle_device_release(self, device_id: int) -> None:
         device = self._devices[device_id]
         device.current_request = None
+        if (self.__changes is not None):
+            self.__changes.devices.add(device_id)
+        self._on_device_released(device_id)
+        self.__busy_devices.change(self.__current_simulation_time, -1)
         request = self._take_from_buffer()
         if (not request):
             device.next_request_time = MAX_TIME
             return
         
+        self.__buffer_occupancy.change(self.__current_simulation_time, -1)
         time = self.__current_simulation_time - request.generation_time
-        self._sources[request.source_id].buffer_stats.add_time(time)
+        if (self.__first_observed is None or request.number >= self.__first_observed[request.source_id]):
+            self._sources[request.source_id].buffer_stats.add_time(time)
+        if (self.__changes is not None):
+            self.__changes.sources.add(request.source_id)
+            self.__changes.request = request
         self.__occupy_next_device(request)
+        if (self.__warmup is not None or self.__stopping_rule is not None):
+            self.__observe_request(time, False)
+            if (self.__stop_requested and self.__termination_time is None):
+                self.__terminate_arrivals(None)
+
+    # A settled stopping rule only raises a flag, arrivals are terminated by the handler
+    # once the arrival being processed, if any, is done
+    def __observe_request(self, wait_time: int, rejected: bool) -> None:
+        if (self.__warmup is not None):
+            if (self.__warmup.observe(wait_time, rejected)):
+                self.__warmup = None
+                self.reset_statistics()
+            return
+        if (self.__stopping_rule.observe(rejected)):
+            self.__stop_requested = True
 
     def __occupy_next_device(self, request: Request) -> bool:
         device_id = self._pick_device()
@@ -152,12 +639,26 @@ class Simulator(ABC):
         
         device = self._devices[device_id]
         processing_time = self._device_processing_time(device_id, request)
-        self._sources[request.source_id].device_stats.add_time(processing_time)
+        if (self.__first_observed is None or request.number >= self.__first_observed[request.source_id]):
+            self._sources[request.source_id].device_stats.add_time(processing_time)
         device.current_request = request
         device.time_in_usage += processing_time
-        self._add_special_event(SpecialEvent(
+        self._on_device_occupied(device_id)
+        self.__busy_devices.change(self.__current_simulation_time, 1)
+        self.__schedule(
             self.__current_simulation_time + processing_time,
             SpecialEventType.DEVICE_RELEASE,
             device_id
-        ))
-        return True
\ No newline at end of file
+        )
+        return True
+
+def _timed(handler: Callable, stats: HandlerProfile) -> Callable:
+    clock = time.perf_counter_ns
+    def timed(*args):
+        start = clock()
+        try:
+            return handler(*args)
+        finally:
+            stats.calls += 1
+            stats.total_ns += clock() - start
+    return timed
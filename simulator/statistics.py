@@ -1,28 +1,63 @@
 from dataclasses import dataclass, field
 import sys
-from typing import Final, Optional
+from typing import Final, List, Optional
 
 from simulator.components import Request
+from simulator.quantiles import QuantileSketch
 
 MAX_TIME: Final[int] = sys.maxsize
 
 def calc_variance(time_sqr: int, avg_time: float, amount: int) -> float:
     return time_sqr / amount - avg_time ** 2
 
+# Welford running mean and sum of squared deviations over the added samples, for the variance,
+# next to the exact total of the times. Requests that never reached the element count as zero
+# samples, so averages stay per generated request.
 @dataclass
 class ElementStatistics:
-    time: int = 0
-    time_sqr: int = 0
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    total: int = 0
+    sketch: Optional[QuantileSketch] = None
+
+    @property
+    def time(self) -> int:
+        return self.total
 
     def avg_time(self, generated: int) -> float:
-        return self.time / generated
+        return self.total / generated
     
     def variance_time(self, generated: int) -> float:
-        return self.time_sqr / generated - self.avg_time(generated) ** 2
+        # Pools the added samples with generated - count zeros
+        zeros = generated - self.count
+        return (self.m2 + self.count * zeros / generated * self.mean ** 2) / generated
     
     def add_time(self, time: int) -> None:
-        self.time += time
-        self.time_sqr += time ** 2
+        self.count += 1
+        self.total += time
+        delta = time - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (time - self.mean)
+        if (self.sketch is not None):
+            self.sketch.add(time)
+
+    def quantile(self, p: float) -> Optional[float]:
+        if (self.sketch is None):
+            return None
+        return self.sketch.quantile(p)
+
+    def merge(self, other: 'ElementStatistics') -> None:
+        # Chan et al. pairwise combination; sketches can not be combined, so they are dropped
+        count = self.count + other.count
+        if (count > 0):
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+            self.count = count
+            self.total += other.total
+        if (other.count > 0):
+            self.sketch = None
 
 @dataclass
 class SourceStatistics:
@@ -44,8 +79,65 @@ class SourceStatistics:
     def variance_device_time(self) -> float: 
         return self.device_stats.variance_time(self.generated)
 
+    def buffer_time_quantile(self, p: float) -> Optional[float]:
+        return self.buffer_stats.quantile(p)
+
+    def device_time_quantile(self, p: float) -> Optional[float]:
+        return self.device_stats.quantile(p)
+
+    def merge(self, other: 'SourceStatistics') -> None:
+        self.generated += other.generated
+        self.rejected += other.rejected
+        self.buffer_stats.merge(other.buffer_stats)
+        self.device_stats.merge(other.device_stats)
+
 @dataclass
 class DeviceStatistics:
     next_request_time: int = MAX_TIME
     time_in_usage: int = 0
     current_request: Optional[Request] = None
+
+    def merge(self, other: 'DeviceStatistics') -> None:
+        self.time_in_usage += other.time_in_usage
+
+# Time-weighted distribution of an integer level, such as the buffer size or the number of
+# busy devices. durations[k] is the time spent at level k up to last_change_time.
+@dataclass
+class OccupancyStatistics:
+    level: int = 0
+    max_level: int = 0
+    last_change_time: int = 0
+    durations: List[int] = field(default_factory=lambda: [0])
+
+    def change(self, time: int, delta: int) -> None:
+        self.durations[self.level] += time - self.last_change_time
+        self.last_change_time = time
+        self.level += delta
+        if (self.level > self.max_level):
+            self.max_level = self.level
+            if (self.level >= len(self.durations)):
+                self.durations.extend([0] * (self.level - len(self.durations) + 1))
+
+    def restart(self, time: int) -> None:
+        self.max_level = self.level
+        self.last_change_time = time
+        self.durations = [0] * (self.level + 1)
+
+    def durations_until(self, time: int) -> List[int]:
+        durations = list(self.durations)
+        durations[self.level] += time - self.last_change_time
+        return durations
+
+    def distribution(self, time: int) -> List[float]:
+        durations = self.durations_until(time)
+        total = sum(durations)
+        if (total == 0):
+            return [1.0 if level == self.level else 0.0 for level in range(len(durations))]
+        return [duration / total for duration in durations]
+
+    def mean(self, time: int) -> float:
+        durations = self.durations_until(time)
+        total = sum(durations)
+        if (total == 0):
+            return float(self.level)
+        return sum(level * duration for level, duration in enumerate(durations)) / total
@@ -0,0 +1,88 @@
+from enum import IntEnum
+import struct
+from typing import Final, Iterator, Tuple
+
+# time, event type, event id, request source, request number, buffer slot, outcome
+TRACE_RECORD: Final[struct.Struct] = struct.Struct('<qBiiqiB')
+DEFAULT_CHUNK_RECORDS: Final[int] = 65536
+
+class TraceOutcome(IntEnum):
+    SERVED = 0
+    BUFFERED = 1
+    REJECTED = 2
+    TAKEN_FROM_BUFFER = 3
+    DEVICE_IDLE = 4
+
+# Appends fixed-width little-endian records to a file. Records are packed into a
+# preallocated chunk and the chunk is written out only when it is full or flushed.
+class TraceRecorder:
+
+    def __init__(self, file_name: str, chunk_records: int = DEFAULT_CHUNK_RECORDS):
+        self._file = open(file_name, 'ab')
+        self._chunk = bytearray(TRACE_RECORD.size * chunk_records)
+        self._chunk_records = chunk_records
+        self._count = 0
+        self._written = 0
+
+    def __enter__(self) -> 'TraceRecorder':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def records_written(self) -> int:
+        return self._written + self._count
+
+    def record(
+        self,
+        time: int,
+        event_type: int,
+        event_id: int,
+        source_id: int,
+        number: int,
+        slot: int,
+        outcome: TraceOutcome
+    ) -> None:
+        TRACE_RECORD.pack_into(
+            self._chunk,
+            self._count * TRACE_RECORD.size,
+            time, event_type, event_id, source_id, number, slot, outcome
+        )
+        self._count += 1
+        if (self._count == self._chunk_records):
+            self.flush()
+
+    def flush(self) -> None:
+        if (self._count > 0):
+            self._file.write(memoryview(self._chunk)[:self._count * TRACE_RECORD.size])
+            self._written += self._count
+            self._count = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        if (not self._file.closed):
+            self.flush()
+            self._file.close()
+
+def trace_dtype():
+    import numpy
+    return numpy.dtype([
+        ('time', '<i8'),
+        ('event_type', 'u1'),
+        ('event_id', '<i4'),
+        ('source_id', '<i4'),
+        ('number', '<i8'),
+        ('slot', '<i4'),
+        ('outcome', 'u1')
+    ])
+
+def load_trace(file_name: str):
+    # Memory-maps the trace as a NumPy structured array, nothing is parsed or copied
+    import numpy
+    return numpy.memmap(file_name, dtype=trace_dtype(), mode='r')
+
+def iter_trace(file_name: str) -> Iterator[Tuple[int, int, int, int, int, int, int]]:
+    with open(file_name, 'rb') as f:
+        data = f.read()
+    return TRACE_RECORD.iter_unpack(data)
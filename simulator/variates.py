@@ -0,0 +1,98 @@
+from functools import lru_cache
+from math import log
+from random import Random
+from typing import Final, List, Optional
+
+DEFAULT_BLOCK_SIZE: Final[int] = 1024
+INITIAL_BLOCK_SIZE: Final[int] = 16
+
+_MASK_64: Final[int] = (1 << 64) - 1
+_GOLDEN_GAMMA: Final[int] = 0x9E3779B97F4A7C15
+
+@lru_cache(maxsize=None)
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+# Name of the generator behind ExponentialStream. The same seed gives different
+# streams with NumPy and with random.Random, so results are tied to it.
+def backend_name() -> str:
+    return "python" if _numpy() is None else "numpy"
+
+# Unit-mean exponential variates of one independent stream. Single draws and block
+# draws consume the same generator in the same order, so block_size never changes results.
+# Blocks start small and double up to block_size, so rarely used streams stay cheap.
+class ExponentialStream:
+
+    def __init__(self, seed: Optional[int], stream_id: int, block_size: int = DEFAULT_BLOCK_SIZE):
+        self._block_size: int = block_size
+        self._next_block_size: int = min(INITIAL_BLOCK_SIZE, block_size)
+        self._block: List[float] = []
+        self._position: int = 0
+        numpy = _numpy()
+        if (numpy is not None):
+            # NumPy only takes non-negative entropy, negative seeds are taken modulo 2 ** 64
+            entropy = None if seed is None else [seed & _MASK_64 if seed < 0 else seed, stream_id]
+            self._numpy_generator = numpy.random.default_rng(entropy)
+            self._random_gen: Optional[Random] = None
+        else:
+            self._numpy_generator = None
+            self._random_gen = Random() if seed is None else Random(f"{seed}:{stream_id}")
+
+    def next(self) -> float:
+        if (self._block_size <= 1):
+            return self.__draw_one()
+
+        if (self._position == len(self._block)):
+            self._block = self.__draw_block(self._next_block_size)
+            self._next_block_size = min(2 * self._next_block_size, self._block_size)
+            self._position = 0
+        value = self._block[self._position]
+        self._position += 1
+        return value
+
+    def __draw_one(self) -> float:
+        if (self._numpy_generator is not None):
+            return float(self._numpy_generator.standard_exponential())
+        return self._random_gen.expovariate(1.0)
+
+    def __draw_block(self, size: int) -> List[float]:
+        if (self._numpy_generator is not None):
+            return self._numpy_generator.standard_exponential(size).tolist()
+        expovariate = self._random_gen.expovariate
+        return [expovariate(1.0) for _ in range(size)]
+
+def _mix64(value: int) -> int:
+    # SplitMix64 finaliser
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK_64
+    return value ^ (value >> 31)
+
+# Counter-based variates: the value for (stream, index) is a hash of the seed, the stream
+# and the index, so it does not depend on how many other values were drawn before it.
+# Two simulations with the same seed see the same inputs wherever their structure overlaps.
+class IndexedVariates:
+
+    def __init__(self, seed: Optional[int], streams_amount: int, antithetic: bool = False):
+        if (seed is None):
+            seed = Random().getrandbits(64)
+        root = _mix64((seed * _GOLDEN_GAMMA) & _MASK_64)
+        self._keys: List[int] = [_mix64((root + (i + 1) * _GOLDEN_GAMMA) & _MASK_64) for i in range(streams_amount)]
+        self._antithetic: bool = antithetic
+
+    @property
+    def antithetic(self) -> bool:
+        return self._antithetic
+
+    def uniform(self, stream_id: int, index: int) -> float:
+        # 52 random bits centred in their cell, so both value and 1 - value stay inside (0, 1)
+        bits = _mix64((self._keys[stream_id] + (index + 1) * _GOLDEN_GAMMA) & _MASK_64) >> 12
+        value = (bits + 0.5) / 4503599627370496.0
+        return 1.0 - value if self._antithetic else value
+
+    def exponential(self, stream_id: int, index: int) -> float:
+        # Inverse transform, so the antithetic stream mirrors the plain one value by value
+        return -log(1.0 - self.uniform(stream_id, index))
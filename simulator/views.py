@@ -0,0 +1,214 @@
+from copy import copy, deepcopy
+from dataclasses import dataclass
+from typing import Callable, Dict, Generic, Iterator, List, Optional, Sequence, TypeVar, overload
+
+from simulator.components import Request, SpecialEvent, SpecialEventType
+from simulator.statistics import DeviceStatistics, ElementStatistics, OccupancyStatistics, SourceStatistics
+
+T = TypeVar('T')
+V = TypeVar('V')
+
+
+# Read-only views over the live simulator state. Obtaining a view is O(1) and a view
+# always shows the current values; use snapshot() for a detached deep copy.
+class ReadOnlyList(Sequence[V], Generic[T, V]):
+    __slots__ = ('_items', '_wrap')
+
+    def __init__(self, items: List[T], wrap: Callable[[T], V]):
+        self._items = items
+        self._wrap = wrap
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @overload
+    def __getitem__(self, index: int) -> V: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[V]: ...
+    def __getitem__(self, index):
+        if (isinstance(index, slice)):
+            return [self._wrap(item) for item in self._items[index]]
+        return self._wrap(self._items[index])
+
+    def __iter__(self) -> Iterator[V]:
+        return map(self._wrap, self._items)
+
+    def snapshot(self) -> List[T]:
+        return deepcopy(self._items)
+
+class ElementStatisticsView:
+    __slots__ = ('_stats',)
+
+    def __init__(self, stats: ElementStatistics):
+        self._stats = stats
+
+    @property
+    def count(self) -> int:
+        return self._stats.count
+
+    @property
+    def mean(self) -> float:
+        return self._stats.mean
+
+    @property
+    def m2(self) -> float:
+        return self._stats.m2
+
+    @property
+    def total(self) -> int:
+        return self._stats.total
+
+    @property
+    def time(self) -> int:
+        return self._stats.time
+
+    def avg_time(self, generated: int) -> float:
+        return self._stats.avg_time(generated)
+
+    def variance_time(self, generated: int) -> float:
+        return self._stats.variance_time(generated)
+
+    def quantile(self, p: float) -> Optional[float]:
+        return self._stats.quantile(p)
+
+    def snapshot(self) -> ElementStatistics:
+        return deepcopy(self._stats)
+
+class SourceStatisticsView:
+    __slots__ = ('_stats',)
+
+    def __init__(self, stats: SourceStatistics):
+        self._stats = stats
+
+    @property
+    def generated(self) -> int:
+        return self._stats.generated
+
+    @property
+    def rejected(self) -> int:
+        return self._stats.rejected
+
+    @property
+    def next_request_time(self) -> int:
+        return self._stats.next_request_time
+
+    @property
+    def buffer_stats(self) -> ElementStatisticsView:
+        return ElementStatisticsView(self._stats.buffer_stats)
+
+    @property
+    def device_stats(self) -> ElementStatisticsView:
+        return ElementStatisticsView(self._stats.device_stats)
+
+    def avg_buffer_time(self) -> float:
+        return self._stats.avg_buffer_time()
+
+    def avg_device_time(self) -> float:
+        return self._stats.avg_device_time()
+
+    def variance_buffer_time(self) -> float:
+        return self._stats.variance_buffer_time()
+
+    def variance_device_time(self) -> float:
+        return self._stats.variance_device_time()
+
+    def buffer_time_quantile(self, p: float) -> Optional[float]:
+        return self._stats.buffer_time_quantile(p)
+
+    def device_time_quantile(self, p: float) -> Optional[float]:
+        return self._stats.device_time_quantile(p)
+
+    def snapshot(self) -> SourceStatistics:
+        return deepcopy(self._stats)
+
+class DeviceStatisticsView:
+    __slots__ = ('_stats',)
+
+    def __init__(self, stats: DeviceStatistics):
+        self._stats = stats
+
+    @property
+    def next_request_time(self) -> int:
+        return self._stats.next_request_time
+
+    @property
+    def time_in_usage(self) -> int:
+        return self._stats.time_in_usage
+
+    @property
+    def current_request(self) -> Optional[Request]:
+        return copy_request(self._stats.current_request)
+
+    def snapshot(self) -> DeviceStatistics:
+        return deepcopy(self._stats)
+
+# Occupancy seen at a given simulation time; the interval since the last change is
+# counted at the current level
+class OccupancyStatisticsView:
+    __slots__ = ('_stats', '_time')
+
+    def __init__(self, stats: OccupancyStatistics, time: int):
+        self._stats = stats
+        self._time = time
+
+    @property
+    def level(self) -> int:
+        return self._stats.level
+
+    @property
+    def max_level(self) -> int:
+        return self._stats.max_level
+
+    def mean(self) -> float:
+        return self._stats.mean(self._time)
+
+    def durations(self) -> List[int]:
+        return self._stats.durations_until(self._time)
+
+    def distribution(self) -> List[float]:
+        return self._stats.distribution(self._time)
+
+    def snapshot(self) -> OccupancyStatistics:
+        return deepcopy(self._stats)
+
+# State touched by a single step: detached copies of the changed sources and devices,
+# and the new contents of the changed buffer slots
+@dataclass
+class StepDelta:
+    event: SpecialEvent
+    sources: Dict[int, SourceStatistics]
+    devices: Dict[int, DeviceStatistics]
+    buffer_slots: Dict[int, Optional[Request]]
+
+# What a batch of events run by run_for, run_until or run_while did
+@dataclass
+class RunSummary:
+    event_counts: Dict[SpecialEventType, int]
+    rejected: int
+    start_time: int
+    end_time: int
+
+    @property
+    def events(self) -> int:
+        return sum(self.event_counts.values())
+
+    @property
+    def time_advanced(self) -> int:
+        return self.end_time - self.start_time
+
+    # Summary of this batch followed by other
+    def merge(self, other: 'RunSummary') -> 'RunSummary':
+        return RunSummary(
+            event_counts={
+                event_type: self.event_counts.get(event_type, 0) + other.event_counts.get(event_type, 0)
+                for event_type in (SpecialEventType.GENERATE_NEW_REQUEST, SpecialEventType.DEVICE_RELEASE)
+            },
+            rejected=self.rejected + other.rejected,
+            start_time=self.start_time,
+            end_time=other.end_time
+        )
+
+def copy_request(request: Optional[Request]) -> Optional[Request]:
+    if (request is None):
+        return None
+    return copy(request)
@@ -0,0 +1,97 @@
+from typing import Final, List, Optional
+
+DEFAULT_BATCH_SIZE: Final[int] = 5
+DEFAULT_MIN_BATCHES: Final[int] = 20
+# The truncation point is searched again each time the series grows by this factor,
+# so the total cost of the checks stays linear in the amount of observations
+CHECK_GROWTH: Final[float] = 1.25
+
+
+# Batch means of one output series and their MSER truncation point
+class _BatchSeries:
+    __slots__ = ('_batch_size', '_batch_sum', '_batch_count', '_means')
+
+    def __init__(self, batch_size: int):
+        self._batch_size: int = batch_size
+        self._batch_sum: float = 0.0
+        self._batch_count: int = 0
+        self._means: List[float] = []
+
+    @property
+    def batches(self) -> int:
+        return len(self._means)
+
+    def add(self, value: float) -> None:
+        self._batch_sum += value
+        self._batch_count += 1
+        if (self._batch_count == self._batch_size):
+            self._means.append(self._batch_sum / self._batch_size)
+            self._batch_sum = 0.0
+            self._batch_count = 0
+
+    def truncation(self) -> Optional[int]:
+        # MSER(d) = sum of squared deviations of the batches after d / (k - d)^2, minimised
+        # over d <= k / 2. A minimum on that boundary means the series is still drifting.
+        means = self._means
+        amount = len(means)
+        shift = means[-1]
+        total = 0.0
+        total_sqr = 0.0
+        best = None
+        best_batch = amount
+        for d in range(amount - 1, -1, -1):
+            value = means[d] - shift
+            total += value
+            total_sqr += value * value
+            if (d > amount // 2):
+                continue
+            remaining = amount - d
+            mser = (total_sqr - total * total / remaining) / (remaining * remaining)
+            if (best is None or mser <= best):
+                best = mser
+                best_batch = d
+        if (best_batch >= amount // 2):
+            return None
+        return best_batch
+
+# Online MSER-5 detector over the waiting time and the rejection indicator of every request
+# leaving the buffer. Steady state is reached once both series have an interior truncation point.
+class Mser5Detector:
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, min_batches: int = DEFAULT_MIN_BATCHES):
+        if (batch_size < 1 or min_batches < 2):
+            raise ValueError("Batch size must be positive and at least two batches are needed")
+        self._batch_size: int = batch_size
+        self._wait_times: _BatchSeries = _BatchSeries(batch_size)
+        self._rejections: _BatchSeries = _BatchSeries(batch_size)
+        self._next_check: int = min_batches
+        self._observations: int = 0
+        self._truncation_point: Optional[int] = None
+
+    @property
+    def observations(self) -> int:
+        return self._observations
+
+    # Amount of observations MSER would delete, known once steady state is detected
+    @property
+    def truncation_point(self) -> Optional[int]:
+        return self._truncation_point
+
+    @property
+    def detected(self) -> bool:
+        return self._truncation_point is not None
+
+    def observe(self, wait_time: int, rejected: bool) -> bool:
+        self._observations += 1
+        self._wait_times.add(wait_time)
+        self._rejections.add(1 if rejected else 0)
+        if (self._truncation_point is not None or self._wait_times.batches < self._next_check):
+            return False
+
+        self._next_check = max(self._next_check + 1, int(self._next_check * CHECK_GROWTH))
+        wait_truncation = self._wait_times.truncation()
+        rejection_truncation = self._rejections.truncation()
+        if (wait_truncation is None or rejection_truncation is None):
+            return False
+        self._truncation_point = max(wait_truncation, rejection_truncation) * self._batch_size
+        return True